@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class GoodsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.imdg'
+
+    def ready(self):
+        import apps.imdg.signals
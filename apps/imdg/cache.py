@@ -0,0 +1,161 @@
+import threading
+import time
+from django.core.cache import cache
+from django.db import transaction
+from .models import IMDGAmendment
+
+GENERATION_KEY = 'imdg:amendment:generation'
+ACTIVE_AMENDMENT_KEY = 'imdg:amendment:active:{generation}'
+ACTIVE_AMENDMENT_TIMEOUT = 60 * 60 * 24
+CONTENT_VERSION_KEY = 'imdg:amendment:{amendment_id}:content:version'
+CONTENT_MODIFIED_KEY = 'imdg:amendment:{amendment_id}:content:modified'
+TABLE_VERSION_KEY = 'imdg:amendment:{amendment_id}:table:{table}:version'
+
+_MISSING = object()
+
+
+def _get_counter(key):
+    # Counters are seeded from the clock so a flushed cache never reuses an old value.
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def _incr_counter(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        _get_counter(key)
+        return cache.incr(key)
+
+
+def get_generation():
+    """Return the current amendment generation shared by every worker."""
+    return _get_counter(GENERATION_KEY)
+
+
+def bump_generation():
+    """
+    Invalidate everything derived from the amendment generation once the
+    current transaction commits.
+    """
+    transaction.on_commit(lambda: _incr_counter(GENERATION_KEY))
+
+
+def get_content_generation(amendment_id):
+    """
+    Return ``(version, last_modified)`` of an amendment's content, where
+    last_modified is the UNIX time of the last write to any of its tables.
+    """
+    version_key = CONTENT_VERSION_KEY.format(amendment_id=amendment_id)
+    modified_key = CONTENT_MODIFIED_KEY.format(amendment_id=amendment_id)
+    values = cache.get_many([version_key, modified_key])
+    version = values.get(version_key)
+    modified = values.get(modified_key)
+    if version is None:
+        version = _get_counter(version_key)
+    if modified is None:
+        modified = int(time.time())
+        cache.add(modified_key, modified, timeout=None)
+    return version, modified
+
+
+def get_table_generation(amendment_id, table):
+    """Return the version of one table of an amendment, bumped by every write to that table."""
+    return _get_counter(TABLE_VERSION_KEY.format(amendment_id=amendment_id, table=table))
+
+
+def bump_content_generation(amendment_id, tables=()):
+    """
+    Record a write to an amendment's content, and to each of ``tables``
+    (model names), once the current transaction commits. Cache entries keyed
+    by the previous version are no longer read and expire on their own.
+    """
+    def _bump():
+        _incr_counter(CONTENT_VERSION_KEY.format(amendment_id=amendment_id))
+        for table in tables:
+            _incr_counter(TABLE_VERSION_KEY.format(amendment_id=amendment_id, table=table))
+        cache.set(CONTENT_MODIFIED_KEY.format(amendment_id=amendment_id), int(time.time()), timeout=None)
+    transaction.on_commit(_bump)
+
+
+class GenerationMemo:
+    """
+    Per-worker value produced by ``builder(generation)`` and rebuilt whenever
+    the shared generation changes.
+    """
+    def __init__(self, builder):
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._generation = None
+        self._value = None
+        self.builds = 0
+
+    def get(self):
+        generation = get_generation()
+        if self._generation == generation:
+            return self._value
+        with self._lock:
+            if self._generation != generation:
+                self._value = self._builder(generation)
+                self._generation = generation
+                self.builds += 1
+            return self._value
+
+
+class ActiveAmendmentResolver:
+    """
+    Resolves the effective IMDG Amendment with an in-process memo in front of the shared cache.
+    The memo is only trusted while the shared generation is unchanged.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._amendment = None
+        self.local_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+
+    def get(self):
+        generation = get_generation()
+        with self._lock:
+            if self._generation == generation:
+                self.local_hits += 1
+                return self._amendment
+
+        key = ACTIVE_AMENDMENT_KEY.format(generation=generation)
+        amendment = cache.get(key, _MISSING)
+        if amendment is _MISSING:
+            amendment = IMDGAmendment.objects.filter(is_effective=True).order_by('-upload_at').first()
+            cache.set(key, amendment, timeout=ACTIVE_AMENDMENT_TIMEOUT)
+            hit = False
+        else:
+            hit = True
+
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.misses += 1
+            self._generation = generation
+            self._amendment = amendment
+        return amendment
+
+    def stats(self):
+        with self._lock:
+            return {
+                'generation': self._generation,
+                'local_hits': self.local_hits,
+                'cache_hits': self.cache_hits,
+                'misses': self.misses,
+            }
+
+
+active_amendment_resolver = ActiveAmendmentResolver()
+
+
+def get_active_amendment():
+    """Return the effective IMDG Amendment, or None when no amendment is effective."""
+    return active_amendment_resolver.get()
@@ -0,0 +1,72 @@
+from django.db import connection, transaction
+from .models import AMENDMENT_TABLES, IMDGAmendment, ClassDivision, SegregationRule, amendment_content_changed
+
+
+class CloneError(Exception):
+    """Raised when an amendment cannot be cloned; ``errors`` lists the problems."""
+    def __init__(self, errors):
+        super().__init__('; '.join(error['detail'] for error in errors))
+        self.errors = errors
+
+
+def _copied_columns(model):
+    return [
+        field.column for field in model._meta.concrete_fields
+        if not field.primary_key and field.name != 'imdgamendment' and not field.generated
+    ]
+
+
+def _clone_table(cursor, model, source_id, target_id):
+    table = connection.ops.quote_name(model._meta.db_table)
+    if model is SegregationRule:
+        # Point the copied rules at the class divisions of the new amendment, matched by code.
+        class_division = connection.ops.quote_name(ClassDivision._meta.db_table)
+        cursor.execute(
+            f'INSERT INTO {table} (imdgamendment_id, fromclass_id, toclass_id, requirement, upload_at) '
+            f'SELECT %(target)s, nf.id, nt.id, s.requirement, s.upload_at FROM {table} s '
+            f'JOIN {class_division} f ON f.id = s.fromclass_id AND f.imdgamendment_id = %(source)s '
+            f'JOIN {class_division} t ON t.id = s.toclass_id AND t.imdgamendment_id = %(source)s '
+            f'JOIN {class_division} nf ON nf.imdgamendment_id = %(target)s AND nf.code = f.code '
+            f'JOIN {class_division} nt ON nt.imdgamendment_id = %(target)s AND nt.code = t.code '
+            f'WHERE s.imdgamendment_id = %(source)s ORDER BY s.id',
+            {'source': source_id, 'target': target_id},
+        )
+    else:
+        columns = ', '.join(_copied_columns(model))
+        cursor.execute(
+            f'INSERT INTO {table} (imdgamendment_id, {columns}) '
+            f'SELECT %(target)s, {columns} FROM {table} WHERE imdgamendment_id = %(source)s ORDER BY id',
+            {'source': source_id, 'target': target_id},
+        )
+    return cursor.rowcount
+
+
+def clone_amendment(source, name, progress=None):
+    """
+    Copy every table of the ``source`` amendment into a new draft amendment
+    named ``name`` with one INSERT ... SELECT per table, in one transaction.
+    The amendment and its partitions are committed first, so the copy holds
+    no locks on the parent tables; they are deleted again if the copy fails.
+    Returns the new amendment's id and the number of rows copied per table.
+    """
+    if IMDGAmendment.objects.filter(name=name).exists():
+        raise CloneError([{'detail': f"IMDG Amendment {name} already exists."}])
+
+    total = len(AMENDMENT_TABLES)
+    counts = {}
+    with transaction.atomic():
+        amendment = IMDGAmendment.objects.create(name=name)
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for processed, (table, model) in enumerate(AMENDMENT_TABLES.items(), start=1):
+                    counts[table] = _clone_table(cursor, model, source.pk, amendment.pk)
+                    if progress:
+                        progress(processed, total)
+            for table, model in AMENDMENT_TABLES.items():
+                if counts[table]:
+                    amendment_content_changed.send(sender=model, amendment_id=amendment.pk)
+    except Exception:
+        amendment.delete()
+        raise
+    return {'imdgamendment': amendment.pk, 'name': amendment.name, 'source': source.pk, 'rows': counts}
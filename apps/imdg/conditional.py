@@ -0,0 +1,71 @@
+import hashlib
+from functools import wraps
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from .cache import get_active_amendment, get_content_generation
+
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def preferred_encoding(request):
+    """Pick the content coding for a response: 'br', 'gzip' or '' for identity."""
+    accepted = {
+        coding.split(';')[0].strip().lower()
+        for coding in request.headers.get('Accept-Encoding', '').split(',')
+    }
+    for coding in CONTENT_CODINGS:
+        if coding in accepted:
+            return coding
+    return ''
+
+
+def generation_etag(request, amendment_id, version, variant=''):
+    """
+    Strong ETag of a response that depends only on the request, the
+    negotiated content coding and the content generation of an amendment.
+    """
+    renderer = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    encoding = preferred_encoding(request)
+    digest = hashlib.md5(f'{request.get_full_path()}|{renderer}|{encoding}|{variant}'.encode('utf-8')).hexdigest()[:16]
+    return quote_etag(f'{amendment_id}-{version}-{digest}')
+
+
+def is_not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def not_modified_response(etag, last_modified):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def conditional_on_generation(view_method):
+    """
+    Answer conditional GETs on IMDG reference endpoints with 304 from the
+    effective amendment's content generation, before the view runs any query,
+    and stamp ETag / Last-Modified on successful responses.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        active_amendment = get_active_amendment()
+        if not active_amendment:
+            return view_method(self, request, *args, **kwargs)
+
+        version, last_modified = get_content_generation(active_amendment.pk)
+        etag = generation_etag(request, active_amendment.pk, version)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+    return wrapper
@@ -0,0 +1,108 @@
+from django.db import connection, models, transaction
+from .jobs import update_progress
+from .models import AMENDMENT_TABLES, IMDGAmendment, ExpandedDangerousGoods, amendment_content_changed
+from .partitions import drop_amendment_partitions
+
+DELETE_BATCH_SIZE = 2000
+AMENDMENT_CONDITION = 'imdgamendment_id = %(amendment_id)s'
+DELETE_BATCH_SQL = """
+    WITH batch AS (
+        SELECT {pk} FROM {table} WHERE {condition} AND {pk} > %(last_pk)s ORDER BY {pk} LIMIT {limit}
+    )
+    DELETE FROM {table} t USING batch WHERE t.{pk} = batch.{pk} RETURNING t.{pk}
+"""
+
+
+def _deletion_plan(model, condition, cascade=True):
+    """
+    Return the ``(model, condition)`` steps deleting the rows of ``model``
+    matching ``condition``, preceded by the rows that cascade from them.
+    """
+    plan = []
+    if cascade:
+        table = connection.ops.quote_name(model._meta.db_table)
+        for relation in model._meta.related_objects:
+            if relation.on_delete is models.CASCADE:
+                plan += _deletion_plan(
+                    relation.related_model,
+                    f'{relation.field.column} IN (SELECT {model._meta.pk.column} FROM {table} WHERE {condition})',
+                )
+    plan.append((model, condition))
+    return plan
+
+
+def _count(cursor, model, condition, params):
+    cursor.execute(f'SELECT count(*) FROM {connection.ops.quote_name(model._meta.db_table)} WHERE {condition}', params)
+    return cursor.fetchone()[0]
+
+
+def _run_plan(job, plan, params, total=0):
+    """
+    Delete every step of ``plan`` in primary key ranges of DELETE_BATCH_SIZE
+    rows, one transaction per batch. ``total`` counts rows the caller
+    removes on its own afterwards.
+    """
+    deleted = {}
+    with connection.cursor() as cursor:
+        counts = [_count(cursor, model, condition, params) for model, condition in plan]
+        update_progress(job, 0, total=total + sum(counts))
+        processed = 0
+        for (model, condition), count in zip(plan, counts):
+            if not count:
+                continue
+            sql = DELETE_BATCH_SQL.format(
+                table=connection.ops.quote_name(model._meta.db_table),
+                pk=model._meta.pk.column,
+                condition=condition,
+                limit=DELETE_BATCH_SIZE,
+            )
+            last_pk = 0
+            while True:
+                with transaction.atomic():
+                    cursor.execute(sql, {**params, 'last_pk': last_pk})
+                    pks = [row[0] for row in cursor.fetchall()]
+                if not pks:
+                    break
+                last_pk = max(pks)
+                deleted[model] = deleted.get(model, 0) + len(pks)
+                processed += len(pks)
+                update_progress(job, processed)
+    return deleted
+
+
+def _notify(amendment_id, deleted):
+    for model in AMENDMENT_TABLES.values():
+        if deleted.get(model):
+            amendment_content_changed.send(sender=model, amendment_id=amendment_id)
+
+
+def delete_table_rows(job, table):
+    """Delete every row of one table of the job's amendment, with the rows that cascade from them."""
+    amendment_id = job.imdgamendment_id
+    deleted = _run_plan(job, _deletion_plan(AMENDMENT_TABLES[table], AMENDMENT_CONDITION), {'amendment_id': amendment_id})
+    # Rows reachable through several cascades were counted once per path.
+    update_progress(job, job.processed, total=job.processed)
+    _notify(amendment_id, deleted)
+    return {'table': table, 'rows': {model._meta.model_name: count for model, count in deleted.items() if count}}
+
+
+def delete_amendment_rows(job):
+    """
+    Drop the partitions of the job's amendment, children first, then delete
+    the amendment itself, which no longer has rows for Django to collect.
+    """
+    amendment_id = job.imdgamendment_id
+    params = {'amendment_id': amendment_id}
+    with connection.cursor() as cursor:
+        total = sum(_count(cursor, model, AMENDMENT_CONDITION, params) for model in AMENDMENT_TABLES.values())
+    deleted = _run_plan(job, [(ExpandedDangerousGoods, AMENDMENT_CONDITION)], params, total=total)
+
+    def progress(model, count):
+        update_progress(job, job.processed + count)
+
+    deleted.update(drop_amendment_partitions(amendment_id, progress=progress))
+    _notify(amendment_id, deleted)
+    IMDGAmendment.objects.filter(pk=amendment_id).delete()
+    # The amendment is gone, and with it the job's reference to it.
+    job.imdgamendment_id = None
+    return {'imdgamendment': amendment_id, 'rows': {model._meta.model_name: count for model, count in deleted.items() if count}}
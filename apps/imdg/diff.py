@@ -0,0 +1,133 @@
+import json
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from .cache import get_table_generation
+from .models import AMENDMENT_TABLES, ClassDivision, DangerousGoods, SegregationRule
+
+DIFF_CACHE_KEY = 'imdg:diff:{table}:{from_id}:{from_version}:{to_id}:{to_version}'
+DIFF_CACHE_TIMEOUT = 60 * 60 * 24
+DIFF_EXCLUDED_FIELDS = ('id', 'imdgamendment', 'search_vector', 'upload_at')
+DIFF_SQL = """
+    WITH a AS ({rows} WHERE r.imdgamendment_id = %(from_id)s),
+         b AS ({rows} WHERE r.imdgamendment_id = %(to_id)s)
+    SELECT {keys}, a.id, b.id,
+           CASE WHEN b.id IS NULL OR a.hash <> b.hash THEN a.doc END,
+           CASE WHEN a.id IS NULL OR a.hash <> b.hash THEN b.doc END
+    FROM a FULL OUTER JOIN b ON {join}
+    WHERE a.id IS NULL OR b.id IS NULL OR a.hash <> b.hash
+    ORDER BY {order}
+"""
+
+
+def _diff_source(model):
+    """Return the relation, natural key and compared fields of a table, as SQL expressions over ``r``."""
+    quote = connection.ops.quote_name
+    relation = f'{quote(model._meta.db_table)} r'
+    if model is SegregationRule:
+        class_division = quote(ClassDivision._meta.db_table)
+        relation += (
+            f' JOIN {class_division} f ON f.id = r.fromclass_id AND f.imdgamendment_id = r.imdgamendment_id'
+            f' JOIN {class_division} t ON t.id = r.toclass_id AND t.imdgamendment_id = r.imdgamendment_id'
+        )
+        return relation, [('from_class_code', 'f.code'), ('to_class_code', 't.code')], [('requirement', 'r.requirement')]
+
+    if model is DangerousGoods:
+        # A UN number can have several entries for the same packing group; they pair up in id order.
+        keys = [
+            ('un_code', "COALESCE(r.un_code, '')"),
+            ('packing_group_code', "COALESCE(r.packing_group_code, '')"),
+            ('occurrence', 'row_number() OVER (PARTITION BY r.un_code, r.packing_group_code ORDER BY r.id)'),
+        ]
+    else:
+        keys = [('code', 'r.code')]
+    key_names = {name for name, _ in keys}
+    fields = [
+        (field.name, f'r.{field.column}') for field in model._meta.concrete_fields
+        if field.name not in DIFF_EXCLUDED_FIELDS and field.name not in key_names
+    ]
+    return relation, keys, fields
+
+
+def _diff_sql(model):
+    relation, keys, fields = _diff_source(model)
+    doc = 'jsonb_build_object({})'.format(', '.join(f"'{name}', {expression}" for name, expression in fields))
+    key_columns = ', '.join(f'{expression} AS {name}' for name, expression in keys)
+    rows = f'SELECT r.id, {key_columns}, {doc} AS doc, md5({doc}::text) AS hash FROM {relation}'
+    names = [name for name, _ in keys]
+    sql = DIFF_SQL.format(
+        rows=rows,
+        keys=', '.join(f'COALESCE(a.{name}, b.{name})' for name in names),
+        join=' AND '.join(f'a.{name} = b.{name}' for name in names),
+        order=', '.join(f'COALESCE(a.{name}, b.{name})' for name in names),
+    )
+    return sql, names
+
+
+def diff_table(model, from_id, to_id):
+    """
+    Compare one table of two amendments on its natural key and return the
+    added, removed and modified rows. Rows are matched and compared by an
+    md5 hash of their content in one FULL OUTER JOIN, so only the rows that
+    differ leave the database.
+    """
+    sql, names = _diff_sql(model)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'from_id': from_id, 'to_id': to_id})
+        rows = cursor.fetchall()
+
+    changes = []
+    for row in rows:
+        key = dict(zip(names, row))
+        from_pk, to_pk, before, after = row[len(names):]
+        if isinstance(before, str):
+            before = json.loads(before)
+        if isinstance(after, str):
+            after = json.loads(after)
+        if to_pk is None:
+            changes.append({'change': 'removed', 'key': key, 'from_id': from_pk, 'to_id': None, 'row': before})
+        elif from_pk is None:
+            changes.append({'change': 'added', 'key': key, 'from_id': None, 'to_id': to_pk, 'row': after})
+        else:
+            fields = {
+                name: [before.get(name), after.get(name)]
+                for name in before.keys() | after.keys() if before.get(name) != after.get(name)
+            }
+            changes.append({'change': 'modified', 'key': key, 'from_id': from_pk, 'to_id': to_pk, 'fields': fields})
+    return changes
+
+
+def get_table_diff(table, from_id, to_id):
+    """Return the diff of one table, cached until either amendment's copy of the table changes."""
+    model = AMENDMENT_TABLES[table]
+    key = DIFF_CACHE_KEY.format(
+        table=table,
+        from_id=from_id,
+        from_version=get_table_generation(from_id, model._meta.model_name),
+        to_id=to_id,
+        to_version=get_table_generation(to_id, model._meta.model_name),
+    )
+    changes = cache.get(key)
+    if changes is None:
+        changes = diff_table(model, from_id, to_id)
+        cache.set(key, changes, timeout=DIFF_CACHE_TIMEOUT)
+    return changes
+
+
+def iter_diff(from_id, to_id, tables):
+    """
+    Yield the diff as NDJSON, one line per changed row tagged with its table
+    and one chunk per table, followed by a line counting the changes per table.
+    """
+    encoder = DjangoJSONEncoder()
+    summary = {}
+    for table in tables:
+        counts = {'added': 0, 'removed': 0, 'modified': 0}
+        lines = []
+        for change in get_table_diff(table, from_id, to_id):
+            counts[change['change']] += 1
+            lines.append(encoder.encode({'table': table, **change}) + '\n')
+        summary[table] = counts
+        if lines:
+            yield ''.join(lines).encode('utf-8')
+    yield (encoder.encode({'summary': summary}) + '\n').encode('utf-8')
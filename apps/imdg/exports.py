@@ -0,0 +1,129 @@
+import json
+import zlib
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, quote_etag
+from .cache import get_content_generation
+from .conditional import is_not_modified, not_modified_response
+from .models import AMENDMENT_TABLES, SegregationRule
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXCLUDED_FIELDS = ('imdgamendment', 'search_vector')
+SEGREGATION_RULE_COLUMNS = ['id', 'from_class_code', 'to_class_code', 'requirement', 'upload_at']
+
+
+def get_export_columns(model):
+    if model is SegregationRule:
+        return SEGREGATION_RULE_COLUMNS
+    return [field.name for field in model._meta.concrete_fields if field.name not in EXCLUDED_FIELDS]
+
+
+def get_export_rows(model, amendment):
+    """Yield the rows of one table of an amendment as dicts, reading through a server-side cursor."""
+    queryset = model.objects.filter(imdgamendment=amendment).order_by('pk')
+    if model is SegregationRule:
+        queryset = queryset.filter(fromclass__imdgamendment=amendment, toclass__imdgamendment=amendment).annotate(
+            from_class_code=F('fromclass__code'), to_class_code=F('toclass__code'),
+        )
+    return queryset.values(*get_export_columns(model)).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _csv_value(value):
+    # Unquoted empty fields are NULL and quoted ones are empty strings, as PostgreSQL COPY reads them.
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    elif hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _iter_lines(amendment, tables, file_format):
+    encoder = DjangoJSONEncoder()
+    for table in tables:
+        model = AMENDMENT_TABLES[table]
+        if file_format == 'csv':
+            columns = get_export_columns(model)
+            yield ','.join(columns) + '\n'
+            for row in get_export_rows(model, amendment):
+                yield ','.join(_csv_value(row[column]) for column in columns) + '\n'
+        else:
+            for row in get_export_rows(model, amendment):
+                if len(tables) > 1:
+                    row = {'table': table, **row}
+                yield encoder.encode(row) + '\n'
+
+
+def iter_export(amendment, tables, file_format, compress=False):
+    """
+    Yield the export as byte chunks of EXPORT_CHUNK_SIZE lines, gzip-compressed
+    on the fly when ``compress`` is set, so memory stays flat for any table size.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    lines = []
+    for line in _iter_lines(amendment, tables, file_format):
+        lines.append(line)
+        if len(lines) < EXPORT_CHUNK_SIZE:
+            continue
+        chunk = ''.join(lines).encode('utf-8')
+        lines = []
+        chunk = compressor.compress(chunk) if compressor else chunk
+        if chunk:
+            yield chunk
+    chunk = ''.join(lines).encode('utf-8')
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+async def stream_async(iterator):
+    """
+    Drive a synchronous iterator from the event loop one chunk at a time.
+    Django buffers synchronous streaming content entirely under ASGI.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(iterator, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+
+def build_export_response(request, amendment, table, file_format):
+    """
+    Stream one table, or every table as NDJSON when ``table`` is 'all'.
+    The ETag is derived from the amendment's content generation so unchanged data is answered with 304.
+    """
+    tables = list(AMENDMENT_TABLES) if table == 'all' else [table]
+    compress = accepts_gzip(request)
+    version, last_modified = get_content_generation(amendment.pk)
+    etag = quote_etag(f'export-{table}-{file_format}-{amendment.pk}-{version}{"-gzip" if compress else ""}')
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    response = StreamingHttpResponse(
+        stream_async(iter_export(amendment, tables, file_format, compress)),
+        content_type=EXPORT_FORMATS[file_format],
+    )
+    extension = 'ndjson' if file_format == 'ndjson' else 'csv'
+    response['Content-Disposition'] = f'attachment; filename="imdg-{amendment.name}-{table}.{extension}"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Vary'] = 'Accept-Encoding'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    return response
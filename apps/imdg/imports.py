@@ -0,0 +1,244 @@
+import csv
+import os
+import zipfile
+from django.db import connection, transaction
+from .exports import get_export_columns
+from .integrity import describe_dangling, find_dangling_references
+from .models import AMENDMENT_TABLES, IMDGAmendment, ClassDivision, SegregationRule, amendment_content_changed
+
+TABLE_NAMES = {model: table for table, model in AMENDMENT_TABLES.items()}
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_ERRORS_LIMIT = 100
+ALL_TABLES = 'all'
+ROWS_TABLE = 'imdg_import_rows'
+SEGREGATION_RULE_STAGING_COLUMNS = {
+    'id': 'bigint',
+    'from_class_code': 'varchar(10)',
+    'to_class_code': 'varchar(10)',
+    'requirement': 'varchar(1)',
+    'upload_at': 'timestamp with time zone',
+}
+# Loads whole NDJSON lines into one jsonb column: neither quote nor delimiter can appear in JSON text.
+NDJSON_COPY_OPTIONS = "FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02'"
+
+
+class BundleError(Exception):
+    """Raised when a bundle cannot be imported; ``errors`` lists every problem found."""
+    def __init__(self, errors):
+        super().__init__('; '.join(error['detail'] for error in errors[:5]))
+        self.errors = errors
+
+
+def staging_table(table):
+    return 'imdg_import_' + table.replace('-', '_')
+
+
+def has_code(model):
+    return any(field.name == 'code' for field in model._meta.concrete_fields)
+
+
+def _staging_columns(model):
+    if model is SegregationRule:
+        return SEGREGATION_RULE_STAGING_COLUMNS
+    fields = {field.name: field for field in model._meta.concrete_fields}
+    return {
+        column: 'bigint' if column == 'id' else fields[column].db_type(connection)
+        for column in get_export_columns(model)
+    }
+
+
+def _create_staging_tables(cursor):
+    for table, model in AMENDMENT_TABLES.items():
+        columns = ', '.join(f'{name} {db_type}' for name, db_type in _staging_columns(model).items())
+        cursor.execute(f'CREATE TEMPORARY TABLE {staging_table(table)} ({columns}) ON COMMIT DROP')
+    cursor.execute(f'CREATE TEMPORARY TABLE {ROWS_TABLE} (doc jsonb) ON COMMIT DROP')
+
+
+def _copy_csv(cursor, table, stream):
+    header = next(csv.reader([stream.readline().decode('utf-8-sig')]), [])
+    columns = _staging_columns(AMENDMENT_TABLES[table])
+    unknown = [column for column in header if column not in columns]
+    if not header or unknown:
+        raise BundleError([{'table': table, 'detail': f"{table}: unknown CSV columns {unknown or header}."}])
+    cursor.copy_expert(f'COPY {staging_table(table)} ({", ".join(header)}) FROM STDIN WITH (FORMAT csv)', stream)
+
+
+def _copy_ndjson(cursor, table, stream):
+    cursor.execute(f'TRUNCATE {ROWS_TABLE}')
+    cursor.copy_expert(f'COPY {ROWS_TABLE} (doc) FROM STDIN WITH ({NDJSON_COPY_OPTIONS})', stream)
+    if table != ALL_TABLES:
+        tables = [table]
+        condition = 'TRUE'
+    else:
+        cursor.execute(
+            f"SELECT DISTINCT doc->>'table' FROM {ROWS_TABLE} WHERE doc IS NOT NULL AND NOT (doc->>'table' = ANY(%s))",
+            [list(AMENDMENT_TABLES)],
+        )
+        unknown = [row[0] for row in cursor.fetchall()]
+        if unknown:
+            raise BundleError([{'table': ALL_TABLES, 'detail': f"Unknown tables {unknown}."}])
+        tables = list(AMENDMENT_TABLES)
+        condition = "doc->>'table' = %s"
+
+    for name in tables:
+        staging = staging_table(name)
+        cursor.execute(
+            f'INSERT INTO {staging} SELECT r.* FROM {ROWS_TABLE}, jsonb_populate_record(NULL::{staging}, doc) r '
+            f'WHERE doc IS NOT NULL AND {condition}',
+            [name] if table == ALL_TABLES else None,
+        )
+
+
+def _load_file(cursor, table, file_format, stream):
+    if file_format not in IMPORT_FORMATS:
+        raise BundleError([{'table': table, 'detail': f"{table}.{file_format}: files must be one of {', '.join(IMPORT_FORMATS)}."}])
+    if table not in AMENDMENT_TABLES and not (table == ALL_TABLES and file_format == 'ndjson'):
+        raise BundleError([{'table': table, 'detail': f"{table}.{file_format}: not an IMDG table."}])
+    if file_format == 'csv':
+        _copy_csv(cursor, table, stream)
+    else:
+        _copy_ndjson(cursor, table, stream)
+
+
+def load_bundle(cursor, path):
+    """
+    Stream a bundle into the staging tables with COPY. A bundle is a zip of
+    one '<table>.csv' or '<table>.ndjson' file per table, as written by the
+    export endpoint, or the single NDJSON file of the 'all' export.
+    """
+    if not zipfile.is_zipfile(path):
+        with open(path, 'rb') as stream:
+            _load_file(cursor, ALL_TABLES, 'ndjson', stream)
+        return
+    with zipfile.ZipFile(path) as bundle:
+        for member in bundle.infolist():
+            if member.is_dir():
+                continue
+            table, extension = os.path.splitext(os.path.basename(member.filename))
+            with bundle.open(member) as stream:
+                _load_file(cursor, table, extension.lstrip('.').lower(), stream)
+
+
+def validate_staging(cursor, allow_dangling=False):
+    """
+    Check the staged rows in SQL: missing and duplicate codes, segregation
+    rules between unknown class divisions and codes referenced by Dangerous
+    Goods that no table defines. Returns ``(errors, warnings)``.
+    """
+    errors = []
+    for table, model in AMENDMENT_TABLES.items():
+        if not has_code(model):
+            continue
+        staging = staging_table(table)
+        cursor.execute(f"SELECT count(*) FROM {staging} WHERE code IS NULL OR code = ''")
+        missing = cursor.fetchone()[0]
+        if missing:
+            errors.append({'table': table, 'detail': f"{table}: {missing} rows without a code."})
+        cursor.execute(f'SELECT code FROM {staging} WHERE code IS NOT NULL GROUP BY code HAVING count(*) > 1 ORDER BY code LIMIT %s', [IMPORT_ERRORS_LIMIT])
+        for (code,) in cursor.fetchall():
+            errors.append({'table': table, 'code': code, 'detail': f"{table}: duplicate code {code}."})
+
+    rules = staging_table('segregation-rules')
+    class_divisions = staging_table('class-divisions')
+    for column in ('from_class_code', 'to_class_code'):
+        cursor.execute(
+            f'SELECT DISTINCT s.{column} FROM {rules} s '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {class_divisions} c WHERE c.code = s.{column}) LIMIT %s',
+            [IMPORT_ERRORS_LIMIT],
+        )
+        for (code,) in cursor.fetchall():
+            errors.append({'table': 'segregation-rules', 'code': code, 'detail': f"segregation-rules: unknown class division {code}."})
+    cursor.execute(
+        f'SELECT from_class_code, to_class_code FROM {rules} GROUP BY 1, 2 HAVING count(*) > 1 LIMIT %s',
+        [IMPORT_ERRORS_LIMIT],
+    )
+    for from_code, to_code in cursor.fetchall():
+        errors.append({'table': 'segregation-rules', 'detail': f"segregation-rules: duplicate rule {from_code} -> {to_code}."})
+    requirements = [choice for choice, _ in SegregationRule.SEGREGATION_REQUIREMENT_CHOICES]
+    cursor.execute(f'SELECT DISTINCT requirement FROM {rules} WHERE NOT (requirement = ANY(%s))', [requirements])
+    for (requirement,) in cursor.fetchall():
+        errors.append({'table': 'segregation-rules', 'detail': f"segregation-rules: invalid requirement {requirement}."})
+
+    dangling, _ = find_dangling_references(
+        cursor,
+        staging_table('dangerous-goods'),
+        lambda model: staging_table(TABLE_NAMES[model]),
+        limit=IMPORT_ERRORS_LIMIT,
+    )
+    references = describe_dangling(dangling)
+    if allow_dangling:
+        return errors, references
+    return errors + references, []
+
+
+def _publish(cursor, amendment):
+    """Copy the staged rows into the new amendment, keeping their relative order."""
+    counts = {}
+    for table, model in AMENDMENT_TABLES.items():
+        staging = staging_table(table)
+        target = connection.ops.quote_name(model._meta.db_table)
+        if model is SegregationRule:
+            class_division = connection.ops.quote_name(ClassDivision._meta.db_table)
+            cursor.execute(
+                f"INSERT INTO {target} (imdgamendment_id, fromclass_id, toclass_id, requirement, upload_at) "
+                f"SELECT %s, f.id, t.id, COALESCE(s.requirement, 'X'), COALESCE(s.upload_at, now()) FROM {staging} s "
+                f"JOIN {class_division} f ON f.imdgamendment_id = %s AND f.code = s.from_class_code "
+                f"JOIN {class_division} t ON t.imdgamendment_id = %s AND t.code = s.to_class_code "
+                f"ORDER BY s.id NULLS LAST",
+                [amendment.pk, amendment.pk, amendment.pk],
+            )
+        else:
+            columns = [column for column in _staging_columns(model) if column not in ('id', 'upload_at')]
+            column_list = ', '.join(columns)
+            cursor.execute(
+                f'INSERT INTO {target} (imdgamendment_id, {column_list}, upload_at) '
+                f'SELECT %s, {column_list}, COALESCE(upload_at, now()) FROM {staging} ORDER BY id NULLS LAST',
+                [amendment.pk],
+            )
+        counts[table] = cursor.rowcount
+    return counts
+
+
+def import_bundle(path, name, activate=False, allow_dangling=False, progress=None):
+    """
+    Import a bundle as a new amendment named ``name`` in one transaction:
+    stream it into staging tables, validate it in SQL and publish it, or
+    raise BundleError and leave the database untouched. The amendment and
+    its partitions are committed first, so the import holds no locks on the
+    parent tables; they are deleted again if the import fails. Dangling code
+    references of Dangerous Goods are reported as warnings when
+    ``allow_dangling`` is set.
+    """
+    if IMDGAmendment.objects.filter(name=name).exists():
+        raise BundleError([{'detail': f"IMDG Amendment {name} already exists."}])
+
+    steps = 4
+    with transaction.atomic():
+        amendment = IMDGAmendment.objects.create(name=name)
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                _create_staging_tables(cursor)
+                load_bundle(cursor, path)
+                if progress:
+                    progress(1, steps)
+                errors, warnings = validate_staging(cursor, allow_dangling)
+                if errors:
+                    raise BundleError(errors)
+                if progress:
+                    progress(2, steps)
+                counts = _publish(cursor, amendment)
+                if progress:
+                    progress(3, steps)
+            if activate:
+                amendment.is_effective = True
+                amendment.save()
+            for table, model in AMENDMENT_TABLES.items():
+                if counts[table]:
+                    amendment_content_changed.send(sender=model, amendment_id=amendment.pk)
+    except Exception:
+        amendment.delete()
+        raise
+    if progress:
+        progress(steps, steps)
+    return {'imdgamendment': amendment.pk, 'name': amendment.name, 'rows': counts, 'warnings': warnings}
@@ -0,0 +1,84 @@
+from django.db import connection
+from .models import DANGEROUS_GOODS_CODE_FIELDS, DangerousGoods
+from .services import DANGEROUS_GOODS_SINGLE_CODE_FIELDS
+
+INTEGRITY_ERRORS_LIMIT = 1000
+# The amendment filter lets each anti-join read a single partition.
+AMENDMENT_ROWS_SQL = '(SELECT * FROM {table} WHERE imdgamendment_id = %(amendment_id)s)'
+
+ARRAY_REFERENCE_SQL = """
+    SELECT d.id, d.un_code, ref.code, count(*) OVER ()
+    FROM {dangerous_goods} d
+    CROSS JOIN LATERAL jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(d.{field}) = 'array' THEN d.{field} ELSE '[]'::jsonb END
+    ) AS ref(code)
+    WHERE NOT EXISTS (SELECT 1 FROM {codes} c WHERE c.code = ref.code)
+    ORDER BY d.id
+"""
+SCALAR_REFERENCE_SQL = """
+    SELECT d.id, d.un_code, d.{field}, count(*) OVER ()
+    FROM {dangerous_goods} d
+    WHERE d.{field} IS NOT NULL AND d.{field} <> ''
+    AND NOT EXISTS (SELECT 1 FROM {codes} c WHERE c.code = d.{field})
+    ORDER BY d.id
+"""
+
+
+def find_dangling_references(cursor, dangerous_goods, codes_of, params=None, limit=None):
+    """
+    Return the codes referenced by Dangerous Goods that have no row in the
+    referenced table, as ``{reference: [{'id', 'un_code', 'code'}]}`` with at
+    most ``limit`` rows each, and ``{reference: total}`` counted before the
+    limit. Each reference is checked with one anti-join. ``dangerous_goods``
+    and ``codes_of(model)`` are SQL relations, so the same checks run against
+    staged imports and published amendments.
+    """
+    references = [
+        (reference, field_name, model_class, SCALAR_REFERENCE_SQL)
+        for reference, (field_name, model_class) in DANGEROUS_GOODS_SINGLE_CODE_FIELDS.items()
+    ] + [
+        (reference, field_name, model_class, ARRAY_REFERENCE_SQL)
+        for reference, (field_name, model_class) in DANGEROUS_GOODS_CODE_FIELDS.items()
+    ]
+
+    dangling = {}
+    totals = {}
+    for reference, field_name, model_class, template in references:
+        sql = template.format(dangerous_goods=dangerous_goods, field=field_name, codes=codes_of(model_class))
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        if rows:
+            dangling[reference] = [{'id': pk, 'un_code': un_code, 'code': code} for pk, un_code, code, _ in rows]
+            totals[reference] = rows[0][3]
+    return dangling, totals
+
+
+def describe_dangling(dangling):
+    """Flatten the result of find_dangling_references into one report entry per reference."""
+    return [
+        {'table': 'dangerous-goods', 'reference': reference, 'un_code': row['un_code'], 'code': row['code'],
+         'detail': f"dangerous-goods: UN {row['un_code']} references unknown {reference} {row['code']}."}
+        for reference, rows in dangling.items() for row in rows
+    ]
+
+
+def check_amendment_references(amendment_id, limit=INTEGRITY_ERRORS_LIMIT):
+    """
+    Find the codes referenced by the Dangerous Goods of a stored amendment
+    that its code tables do not define. Returns the total number of dangling
+    references per reference, and up to ``limit`` of each described.
+    """
+    def amendment_rows(model):
+        return AMENDMENT_ROWS_SQL.format(table=connection.ops.quote_name(model._meta.db_table))
+
+    with connection.cursor() as cursor:
+        dangling, totals = find_dangling_references(
+            cursor, amendment_rows(DangerousGoods), amendment_rows, {'amendment_id': amendment_id}, limit=limit,
+        )
+    return {
+        'imdgamendment': amendment_id,
+        'counts': totals,
+        'references': describe_dangling(dangling),
+    }
@@ -0,0 +1,70 @@
+import os
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import IMDGJob
+
+JOB_PROGRESS_KEY = 'imdg:job:{job_id}:progress'
+JOB_PROGRESS_TIMEOUT = 60 * 60 * 24
+
+
+def create_job(kind, amendment_id=None, total=None):
+    return IMDGJob.objects.create(kind=kind, imdgamendment_id=amendment_id, total=total)
+
+
+def update_progress(job, processed, total=None):
+    """
+    Record the progress of a running job. It is also published through the
+    cache, so it is visible while the job works inside a transaction.
+    """
+    job.processed = processed
+    fields = ['processed']
+    if total is not None:
+        job.total = total
+        fields.append('total')
+    cache.set(JOB_PROGRESS_KEY.format(job_id=job.pk), (job.processed, job.total), timeout=JOB_PROGRESS_TIMEOUT)
+    job.save(update_fields=fields)
+
+
+def with_live_progress(job):
+    """Return ``job`` with the progress published by its worker when it is still running."""
+    if job.status == IMDGJob.STATUS_RUNNING:
+        progress = cache.get(JOB_PROGRESS_KEY.format(job_id=job.pk))
+        if progress:
+            job.processed, job.total = progress
+    return job
+
+
+def save_upload(chunks, suffix=''):
+    """Write an uploaded file to IMDG_UPLOAD_ROOT, shared with the Celery workers, and return its path."""
+    path = os.path.join(settings.IMDG_UPLOAD_ROOT, f'{uuid.uuid4().hex}{suffix}')
+    with open(path, 'wb') as destination:
+        for chunk in chunks:
+            destination.write(chunk)
+    return path
+
+
+def run_job(job_id, work):
+    """
+    Run ``work(job)`` for a pending IMDGJob and record its outcome. The value
+    returned by ``work`` becomes the job result; an exception marks the job
+    failed with its ``errors`` list, or its message.
+    """
+    job = IMDGJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return None
+
+    job.status = IMDGJob.STATUS_RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+    try:
+        job.result = work(job)
+        job.status = IMDGJob.STATUS_SUCCEEDED
+    except Exception as e:
+        job.status = IMDGJob.STATUS_FAILED
+        job.errors = (job.errors or []) + (getattr(e, 'errors', None) or [{'detail': str(e)}])
+    job.finished_at = timezone.now()
+    job.save(update_fields=['imdgamendment', 'status', 'processed', 'total', 'result', 'errors', 'finished_at'])
+    cache.delete(JOB_PROGRESS_KEY.format(job_id=job.pk))
+    return job.status
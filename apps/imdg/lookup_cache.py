@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from django.core.cache import cache
+from .cache import get_active_amendment, get_table_generation
+
+CODE_LOOKUP_KEY = 'imdg:lookup:{amendment_id}:{table}:{version}:{code}'
+CODE_LOOKUP_TIMEOUT = 60 * 60 * 24
+CODE_LOOKUP_LOCAL_SIZE = 2048
+NOT_FOUND = {'found': False}
+
+
+class CodeLookupCache:
+    """
+    Two-tier read-through cache of ``get_by_code`` lookups: a bounded per-worker
+    LRU in front of the shared cache. Entries are keyed by the version of the
+    looked-up table within the effective amendment, so a write to that table
+    makes every older entry unreachable. Unknown codes are cached as well.
+    """
+    def __init__(self, maxsize=CODE_LOOKUP_LOCAL_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.local_hits += 1
+            return entry
+
+    def _set_local(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, serializer_class, code):
+        """Return the serialized instance with ``code`` in the effective amendment, or None when there is none."""
+        active_amendment = get_active_amendment()
+        if not active_amendment:
+            return None
+
+        model = serializer_class.Meta.model
+        table = model._meta.model_name
+        version = get_table_generation(active_amendment.pk, table)
+        key = CODE_LOOKUP_KEY.format(amendment_id=active_amendment.pk, table=table, version=version, code=code)
+
+        entry = self._get_local(key)
+        if entry is None:
+            entry = cache.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.cache_hits += 1
+            else:
+                instance = model.objects.filter(imdgamendment=active_amendment, code=code).first()
+                entry = {'found': True, 'data': dict(serializer_class(instance).data)} if instance else NOT_FOUND
+                cache.set(key, entry, timeout=CODE_LOOKUP_TIMEOUT)
+                with self._lock:
+                    self.misses += 1
+            self._set_local(key, entry)
+        return entry['data'] if entry['found'] else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'local_hits': self.local_hits,
+                'cache_hits': self.cache_hits,
+                'misses': self.misses,
+            }
+
+
+code_lookup_cache = CodeLookupCache()
@@ -0,0 +1,67 @@
+import random
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.imdg.cache import get_active_amendment
+from apps.imdg.models import DangerousGoods
+from apps.imdg.services import IMDGLookupService
+from apps.imdg.views import SearchDangerousGoodsViewSet
+
+BENCHMARK_WARMUP = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the retrieval of Dangerous Goods of the effective IMDG Amendment with their computed details, '
+        'through the view and through IMDGLookupService.get_computed_details.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000, help='Retrievals per kind.')
+
+    def handle(self, *args, **options):
+        active = get_active_amendment()
+        if not active:
+            raise CommandError('No effective IMDG Amendment to benchmark.')
+        pks = list(DangerousGoods.objects.filter(imdgamendment=active).values_list('pk', flat=True))
+        if not pks:
+            raise CommandError(f'IMDG Amendment {active.name} has no Dangerous Goods.')
+
+        for name, lookup in self._lookups(pks):
+            for _ in range(BENCHMARK_WARMUP):
+                lookup()
+            timings = [self._time(lookup) for _ in range(options['repeat'])]
+            percentiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(f'{name}: p50 {percentiles[49]:.3f} ms, p99 {percentiles[98]:.3f} ms')
+
+    def _time(self, lookup):
+        started = time.perf_counter()
+        lookup()
+        return (time.perf_counter() - started) * 1000
+
+    def _lookups(self, pks):
+        factory = APIRequestFactory()
+        # Any user passes IsUser; the benchmark needs no account in the database.
+        user = get_user_model()(email='benchmark@example.com')
+        view = SearchDangerousGoodsViewSet.as_view({'get': 'retrieve'})
+
+        def retrieve():
+            pk = random.choice(pks)
+            request = factory.get(f'/api/imdg/search-dangerous-goods/{pk}/')
+            force_authenticate(request, user=user)
+            response = view(request, pk=pk)
+            response.render()
+            if response.status_code != 200:
+                raise CommandError(f'Retrieving Dangerous Good {pk} answered {response.status_code}.')
+
+        instances = list(DangerousGoods.objects.filter(pk__in=random.sample(pks, min(len(pks), 1000))))
+
+        def computed_details():
+            IMDGLookupService().get_computed_details(random.choice(instances))
+
+        return [
+            ('retrieve with computed details', retrieve),
+            ('get_computed_details', computed_details),
+        ]
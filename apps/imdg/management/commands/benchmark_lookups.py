@@ -0,0 +1,73 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from apps.imdg.cloning import clone_amendment
+from apps.imdg.models import AMENDMENT_TABLES, IMDGAmendment, UNCode, DangerousGoods, SegregationRule
+from apps.imdg.segregation import SegregationMatrix
+
+BENCHMARK_WARMUP = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Time lookups against the effective IMDG Amendment with a growing number of amendments loaded. '
+        'Extra amendments are clones of the effective one, created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--amendments', type=int, nargs='+', default=[1, 10], help='Numbers of amendments to benchmark with.')
+        parser.add_argument('--repeat', type=int, default=200, help='Lookups per query kind.')
+
+    def handle(self, *args, **options):
+        active = IMDGAmendment.objects.filter(is_effective=True).first()
+        if not active:
+            raise CommandError('No effective IMDG Amendment to benchmark.')
+
+        with transaction.atomic():
+            for target in sorted(options['amendments']):
+                for index in range(IMDGAmendment.objects.count(), target):
+                    clone_amendment(active, f'bench-{index}')
+                self._analyze()
+                self.stdout.write(f'{IMDGAmendment.objects.count()} amendments loaded')
+                for name, lookup in self._lookups(active):
+                    for _ in range(BENCHMARK_WARMUP):
+                        lookup()
+                    timings = [self._time(lookup) for _ in range(options['repeat'])]
+                    self.stdout.write(
+                        f'  {name}: median {statistics.median(timings):.3f} ms, '
+                        f'p95 {statistics.quantiles(timings, n=20)[-1]:.3f} ms'
+                    )
+            transaction.set_rollback(True)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            for model in AMENDMENT_TABLES.values():
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+    def _time(self, lookup):
+        started = time.perf_counter()
+        lookup()
+        return (time.perf_counter() - started) * 1000
+
+    def _lookups(self, active):
+        un_codes = list(UNCode.objects.filter(imdgamendment=active).values_list('code', flat=True))
+        class_pairs = list(SegregationRule.objects.filter(imdgamendment=active).values_list('fromclass_id', 'toclass_id'))
+        dangerous_goods = DangerousGoods.objects.filter(imdgamendment=active)
+        lookups = [
+            ('first page of Dangerous Goods', lambda: list(dangerous_goods.order_by('-upload_at', '-id')[:50])),
+            ('Dangerous Goods count', dangerous_goods.count),
+            ('Segregation Rules with class codes', lambda: SegregationMatrix.compile(active)),
+        ]
+        if un_codes:
+            lookups += [
+                ('UN Code by code', lambda: UNCode.objects.filter(imdgamendment=active, code=random.choice(un_codes)).first()),
+                ('Dangerous Goods by UN Code', lambda: list(dangerous_goods.filter(un_code=random.choice(un_codes)))),
+            ]
+        if class_pairs:
+            def segregation_rule():
+                from_id, to_id = random.choice(class_pairs)
+                return SegregationRule.objects.filter(imdgamendment=active, fromclass_id=from_id, toclass_id=to_id).exists()
+            lookups.append(('Segregation Rule exists', segregation_rule))
+        return lookups
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.imdg.integrity import INTEGRITY_ERRORS_LIMIT, check_amendment_references
+from apps.imdg.models import IMDGAmendment
+
+
+class Command(BaseCommand):
+    help = 'Report codes referenced by the Dangerous Goods of an IMDG Amendment that its code tables do not define.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--amendment', type=int, help='Id of the IMDG Amendment; defaults to the effective one.')
+        parser.add_argument('--limit', type=int, default=INTEGRITY_ERRORS_LIMIT, help='Dangling references reported per reference.')
+
+    def handle(self, *args, **options):
+        if options['amendment']:
+            amendment = IMDGAmendment.objects.filter(pk=options['amendment']).first()
+        else:
+            amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        if not amendment:
+            raise CommandError('No such IMDG Amendment.')
+
+        report = check_amendment_references(amendment.pk, limit=options['limit'])
+        for reference in report['references']:
+            self.stderr.write(reference['detail'])
+        if report['counts']:
+            raise CommandError(f"IMDG Amendment {amendment.name} has {sum(report['counts'].values())} dangling references.")
+        self.stdout.write(self.style.SUCCESS(f'IMDG Amendment {amendment.name} has no dangling references.'))
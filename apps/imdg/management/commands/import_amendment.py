@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.imdg.imports import BundleError, import_bundle
+
+
+class Command(BaseCommand):
+    help = 'Import an IMDG Amendment from a bundle: a zip of per-table CSV/NDJSON files or the NDJSON export of all tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the bundle.')
+        parser.add_argument('--name', required=True, help='Name of the new IMDG Amendment.')
+        parser.add_argument('--activate', action='store_true', help='Make the new amendment effective.')
+        parser.add_argument('--allow-dangling', action='store_true', help='Report unknown codes referenced by Dangerous Goods as warnings.')
+
+    def handle(self, *args, **options):
+        try:
+            result = import_bundle(
+                options['path'], options['name'],
+                activate=options['activate'], allow_dangling=options['allow_dangling'],
+            )
+        except BundleError as e:
+            for error in e.errors:
+                self.stderr.write(error['detail'])
+            raise CommandError(f"Bundle rejected with {len(e.errors)} errors.")
+
+        for warning in result['warnings']:
+            self.stderr.write(warning['detail'])
+        for table, count in result['rows'].items():
+            self.stdout.write(f'{table}: {count}')
+        self.stdout.write(self.style.SUCCESS(f"Imported IMDG Amendment {result['name']} (id {result['imdgamendment']})."))
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from .cache import get_active_amendment, get_content_generation
+from .jobs import update_progress
+from .models import DangerousGoods, ExpandedDangerousGoods
+from .serializers import DangerousGoodsSerializer
+from .services import IMDGLookupService
+
+MATERIALIZE_BATCH_SIZE = 500
+MATERIALIZE_DEBOUNCE = 30
+MATERIALIZE_PENDING_KEY = 'imdg:materialize:{amendment_id}:pending'
+MATERIALIZE_CLAIMED = 0
+
+
+def build_expanded_documents(instances):
+    """
+    Build the fully resolved documents of Dangerous Goods of the effective
+    amendment: their fields, labels, placards, segregation rules and every
+    referenced code with its description and file.
+    """
+    instances = list(instances)
+    resolved = IMDGLookupService().resolve_codes(instances)
+    context = {'include_computed': True}
+    documents = []
+    for item in DangerousGoodsSerializer(instances, many=True, context=context).data:
+        item['resolved'] = resolved.get(item['id'], {})
+        documents.append(item)
+    return documents
+
+
+def get_expanded_documents(amendment, pks):
+    """Return the materialized documents of ``pks`` that are current for the amendment's content, keyed by primary key."""
+    if not amendment or not pks:
+        return {}
+    version, _ = get_content_generation(amendment.pk)
+    return dict(
+        ExpandedDangerousGoods.objects.filter(imdgamendment=amendment, version=version, pk__in=pks)
+        .values_list('pk', 'document')
+    )
+
+
+def expanded_documents(amendment, instances):
+    """Return the documents of ``instances`` in order, reading materialized ones and building the rest."""
+    instances = list(instances)
+    documents = get_expanded_documents(amendment, [instance.pk for instance in instances])
+    missing = [instance for instance in instances if instance.pk not in documents]
+    if missing:
+        for document in build_expanded_documents(missing):
+            documents[document['id']] = document
+    return [documents[instance.pk] for instance in instances]
+
+
+def materialize(job):
+    """
+    Write the expanded document of every Dangerous Good of the job's
+    amendment, stamped with the content version read before the first batch.
+    A write during the build bumps the version, so those documents are never
+    served and the write schedules the next build.
+    """
+    amendment = job.imdgamendment
+    if amendment:
+        cache.delete(MATERIALIZE_PENDING_KEY.format(amendment_id=amendment.pk))
+    active_amendment = get_active_amendment()
+    if not amendment or not active_amendment or amendment.pk != active_amendment.pk:
+        return {'skipped': 'The amendment is not effective.'}
+
+    version, _ = get_content_generation(amendment.pk)
+    queryset = DangerousGoods.objects.filter(imdgamendment=amendment).order_by('pk')
+    update_progress(job, 0, total=queryset.count())
+
+    processed = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:MATERIALIZE_BATCH_SIZE])
+        if not batch:
+            break
+        ExpandedDangerousGoods.objects.bulk_create(
+            [
+                ExpandedDangerousGoods(dangerousgoods_id=document['id'], imdgamendment=amendment, version=version, document=document)
+                for document in build_expanded_documents(batch)
+            ],
+            update_conflicts=True,
+            unique_fields=['dangerousgoods'],
+            update_fields=['imdgamendment', 'version', 'document', 'built_at'],
+        )
+        last_pk = batch[-1].pk
+        processed += len(batch)
+        update_progress(job, processed)
+
+    return {'version': version, 'materialized': processed}
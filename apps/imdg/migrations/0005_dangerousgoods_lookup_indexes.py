@@ -0,0 +1,66 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:05
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0004_alter_classdivision_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=models.Index(fields=['imdgamendment', 'un_code'], name='dg_amendment_uncode_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['subsidiary_hazards_codes'], name='dg_subsidiary_hazards_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['special_provisions_codes'], name='dg_special_provisions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['excepted_quantities_codes'], name='dg_excepted_quantities_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['packing_instructions_codes'], name='dg_packing_instructions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['packing_provisions_codes'], name='dg_packing_provisions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ibc_instructions_codes'], name='dg_ibc_instructions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ibc_provisions_codes'], name='dg_ibc_provisions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tank_instructions_codes'], name='dg_tank_instructions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tank_provisions_codes'], name='dg_tank_provisions_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['emergency_schedules_codes'], name='dg_emergency_schedules_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['stowage_handling_codes'], name='dg_stowage_handling_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['segregation_codes'], name='dg_segregation_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
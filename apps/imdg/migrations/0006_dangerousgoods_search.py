@@ -0,0 +1,30 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0005_dangerousgoods_lookup_indexes'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='dangerousgoods',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('proper_shipping_name', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('observations', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dg_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['proper_shipping_name'], name='dg_shipping_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0006_dangerousgoods_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dangerousgoods',
+            index=models.Index(fields=['imdgamendment', '-upload_at', '-id'], name='dg_amendment_keyset_idx'),
+        ),
+    ]
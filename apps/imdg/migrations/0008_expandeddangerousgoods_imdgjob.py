@@ -0,0 +1,49 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0007_dangerousgoods_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpandedDangerousGoods',
+            fields=[
+                ('dangerousgoods', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='expanded', serialize=False, to='imdg.dangerousgoods')),
+                ('version', models.BigIntegerField()),
+                ('document', models.JSONField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('imdgamendment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expanded_dangerousgoods', to='imdg.imdgamendment')),
+            ],
+            options={
+                'db_table': 'imdg.expandeddangerousgoods',
+                'indexes': [models.Index(fields=['imdgamendment', 'version'], name='expanded_dg_amendment_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IMDGJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('materialize', 'Materialize expanded Dangerous Goods')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('errors', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('imdgamendment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='imdg.imdgamendment')),
+            ],
+            options={
+                'db_table': 'imdg.imdgjob',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['imdgamendment', 'kind', '-created_at'], name='job_amendment_kind_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0008_expandeddangerousgoods_imdgjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imdgjob',
+            name='kind',
+            field=models.CharField(choices=[('materialize', 'Materialize expanded Dangerous Goods'), ('import', 'Import amendment bundle')], max_length=20),
+        ),
+    ]
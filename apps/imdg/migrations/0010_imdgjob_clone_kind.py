@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0009_imdgjob_import_kind'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imdgjob',
+            name='kind',
+            field=models.CharField(choices=[('materialize', 'Materialize expanded Dangerous Goods'), ('import', 'Import amendment bundle'), ('clone', 'Clone amendment')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0010_imdgjob_clone_kind'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imdgjob',
+            name='kind',
+            field=models.CharField(choices=[('materialize', 'Materialize expanded Dangerous Goods'), ('import', 'Import amendment bundle'), ('clone', 'Clone amendment'), ('delete-all', 'Delete all rows of a table'), ('delete-amendment', 'Delete amendment')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.0.9 on 2026-10-17 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Amendment tables, parents before children; kept here so later model changes cannot alter this migration.
+PARTITIONED_MODELS = [
+    'UNCode', 'ClassDivision', 'PackingGroup', 'SpecialProvisions', 'ExceptedQuantities',
+    'PackingInstructions', 'PackingProvisions', 'IBCInstructions', 'IBCProvisions', 'TankInstructions',
+    'TankProvisions', 'EmergencySchedules', 'StowageHandling', 'Segregation', 'SegregationRule',
+    'DangerousGoods',
+]
+
+
+def _partition_table(cursor, quote, table, amendment_ids):
+    """
+    Rebuild ``table`` as a table LIST-partitioned on imdgamendment_id, with
+    one partition per amendment and a default partition. The primary key
+    becomes (id, imdgamendment_id), and the identity column becomes a
+    sequence because partitioned tables cannot have identity columns.
+    Constraints and indexes are recreated under their original names.
+    """
+    name = quote(table)
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [name]
+    )
+    primary_key = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('u', 'f', 'c', 'x') ORDER BY conname",
+        [name],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = %s::regclass "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid)",
+        [name],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT attname, format_type(atttypid, atttypmod), attgenerated FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped ORDER BY attnum",
+        [name],
+    )
+    attributes = cursor.fetchall()
+    id_type = next(column_type for column, column_type, _ in attributes if column == 'id')
+    columns = ', '.join(quote(column) for column, _, generated in attributes if not generated)
+
+    staging = quote(f'{table}_partitioned')
+    sequence = quote(f'{table}_id_seq')
+    cursor.execute(
+        f'CREATE TABLE {staging} (LIKE {name} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE) '
+        f'PARTITION BY LIST (imdgamendment_id)'
+    )
+    for amendment_id in amendment_ids:
+        cursor.execute(f'CREATE TABLE {quote(f"{table}_{amendment_id}")} PARTITION OF {staging} FOR VALUES IN ({int(amendment_id)})')
+    cursor.execute(f'CREATE TABLE {quote(f"{table}_default")} PARTITION OF {staging} DEFAULT')
+    cursor.execute(f'INSERT INTO {staging} ({columns}) SELECT {columns} FROM {name}')
+    cursor.execute(f'DROP TABLE {name}')
+    cursor.execute(f'ALTER TABLE {staging} RENAME TO {name}')
+
+    cursor.execute(f'CREATE SEQUENCE {sequence} AS {id_type} OWNED BY {name}.id')
+    cursor.execute(f'SELECT setval(%s, COALESCE(max(id), 0) + 1, false) FROM {name}', [sequence])
+    cursor.execute(f'ALTER TABLE {name} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)', [sequence])
+    cursor.execute(f'ALTER TABLE {name} ADD CONSTRAINT {quote(primary_key)} PRIMARY KEY (id, imdgamendment_id)')
+    for constraint, definition in constraints:
+        cursor.execute(f'ALTER TABLE {name} ADD CONSTRAINT {quote(constraint)} {definition}')
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def partition_amendment_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    amendment_ids = list(apps.get_model('imdg', 'IMDGAmendment').objects.order_by('pk').values_list('pk', flat=True))
+    with connection.cursor() as cursor:
+        for model_name in PARTITIONED_MODELS:
+            table = apps.get_model('imdg', model_name)._meta.db_table
+            _partition_table(cursor, connection.ops.quote_name, table, amendment_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0011_imdgjob_delete_kinds'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expandeddangerousgoods',
+            name='dangerousgoods',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='expanded', serialize=False, to='imdg.dangerousgoods'),
+        ),
+        migrations.AlterField(
+            model_name='segregationrule',
+            name='fromclass',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='from_class', to='imdg.classdivision'),
+        ),
+        migrations.AlterField(
+            model_name='segregationrule',
+            name='toclass',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='to_class', to='imdg.classdivision'),
+        ),
+        migrations.RunPython(partition_amendment_tables),
+    ]
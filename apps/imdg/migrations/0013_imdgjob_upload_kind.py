@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0012_partition_amendment_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imdgjob',
+            name='kind',
+            field=models.CharField(choices=[('materialize', 'Materialize expanded Dangerous Goods'), ('import', 'Import amendment bundle'), ('clone', 'Clone amendment'), ('delete-all', 'Delete all rows of a table'), ('delete-amendment', 'Delete amendment'), ('upload', 'Create rows from an upload')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-17 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdg', '0013_imdgjob_upload_kind'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imdgjob',
+            name='kind',
+            field=models.CharField(choices=[('materialize', 'Materialize expanded Dangerous Goods'), ('import', 'Import amendment bundle'), ('clone', 'Clone amendment'), ('delete-all', 'Delete all rows of a table'), ('delete-amendment', 'Delete amendment'), ('upload', 'Create rows from an upload'), ('check-references', 'Check Dangerous Goods references')], max_length=20),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models, transaction
+from django.dispatch import Signal
 
 class IMDGAmendment(models.Model):
     name = models.CharField(max_length=10, unique=True)
@@ -251,8 +254,9 @@ class SegregationRule(models.Model):
     ]
     id = models.AutoField(primary_key=True)
     imdgamendment = models.ForeignKey(IMDGAmendment, on_delete=models.CASCADE, related_name='segregation_bars')
-    fromclass = models.ForeignKey(ClassDivision, on_delete=models.CASCADE, related_name='from_class')
-    toclass = models.ForeignKey(ClassDivision, on_delete=models.CASCADE, related_name='to_class')
+    # ClassDivision is partitioned by amendment, so its id alone cannot back a foreign key constraint.
+    fromclass = models.ForeignKey(ClassDivision, on_delete=models.CASCADE, related_name='from_class', db_constraint=False)
+    toclass = models.ForeignKey(ClassDivision, on_delete=models.CASCADE, related_name='to_class', db_constraint=False)
     requirement = models.CharField(max_length=1, choices=SEGREGATION_REQUIREMENT_CHOICES, default='X')
     upload_at = models.DateTimeField(auto_now_add=True)
     class Meta:
@@ -285,7 +289,133 @@ class DangerousGoods(models.Model):
     stowage_handling_codes = models.JSONField(null=True, blank=True)
     segregation_codes = models.JSONField(null=True, blank=True)
     observations = models.TextField(null=True, blank=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('proper_shipping_name', weight='A', config='english')
+            + SearchVector('observations', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     upload_at = models.DateTimeField(auto_now_add=True)
     class Meta:
+        indexes = [
+            models.Index(fields=['imdgamendment', 'un_code'], name='dg_amendment_uncode_idx'),
+            models.Index(fields=['imdgamendment', '-upload_at', '-id'], name='dg_amendment_keyset_idx'),
+            GinIndex(fields=['search_vector'], name='dg_search_vector_gin'),
+            GinIndex(fields=['proper_shipping_name'], opclasses=['gin_trgm_ops'], name='dg_shipping_name_trgm'),
+            GinIndex(fields=['subsidiary_hazards_codes'], opclasses=['jsonb_path_ops'], name='dg_subsidiary_hazards_gin'),
+            GinIndex(fields=['special_provisions_codes'], opclasses=['jsonb_path_ops'], name='dg_special_provisions_gin'),
+            GinIndex(fields=['excepted_quantities_codes'], opclasses=['jsonb_path_ops'], name='dg_excepted_quantities_gin'),
+            GinIndex(fields=['packing_instructions_codes'], opclasses=['jsonb_path_ops'], name='dg_packing_instructions_gin'),
+            GinIndex(fields=['packing_provisions_codes'], opclasses=['jsonb_path_ops'], name='dg_packing_provisions_gin'),
+            GinIndex(fields=['ibc_instructions_codes'], opclasses=['jsonb_path_ops'], name='dg_ibc_instructions_gin'),
+            GinIndex(fields=['ibc_provisions_codes'], opclasses=['jsonb_path_ops'], name='dg_ibc_provisions_gin'),
+            GinIndex(fields=['tank_instructions_codes'], opclasses=['jsonb_path_ops'], name='dg_tank_instructions_gin'),
+            GinIndex(fields=['tank_provisions_codes'], opclasses=['jsonb_path_ops'], name='dg_tank_provisions_gin'),
+            GinIndex(fields=['emergency_schedules_codes'], opclasses=['jsonb_path_ops'], name='dg_emergency_schedules_gin'),
+            GinIndex(fields=['stowage_handling_codes'], opclasses=['jsonb_path_ops'], name='dg_stowage_handling_gin'),
+            GinIndex(fields=['segregation_codes'], opclasses=['jsonb_path_ops'], name='dg_segregation_gin'),
+        ]
         ordering = ['-upload_at']
-        db_table = 'imdg.dangerousgoods'
\ No newline at end of file
+        db_table = 'imdg.dangerousgoods'
+
+class ExpandedDangerousGoods(models.Model):
+    """Fully resolved document of a Dangerous Good, materialized in the background per amendment content version."""
+    dangerousgoods = models.OneToOneField(DangerousGoods, on_delete=models.CASCADE, primary_key=True, related_name='expanded', db_constraint=False)
+    imdgamendment = models.ForeignKey(IMDGAmendment, on_delete=models.CASCADE, related_name='expanded_dangerousgoods')
+    version = models.BigIntegerField()
+    document = models.JSONField()
+    built_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['imdgamendment', 'version'], name='expanded_dg_amendment_idx'),
+        ]
+        db_table = 'imdg.expandeddangerousgoods'
+
+class IMDGJob(models.Model):
+    """Progress and outcome of a background job working on an amendment."""
+    KIND_MATERIALIZE = 'materialize'
+    KIND_IMPORT = 'import'
+    KIND_CLONE = 'clone'
+    KIND_DELETE_ALL = 'delete-all'
+    KIND_DELETE_AMENDMENT = 'delete-amendment'
+    KIND_UPLOAD = 'upload'
+    KIND_CHECK_REFERENCES = 'check-references'
+    KIND_CHOICES = [
+        (KIND_MATERIALIZE, 'Materialize expanded Dangerous Goods'),
+        (KIND_IMPORT, 'Import amendment bundle'),
+        (KIND_CLONE, 'Clone amendment'),
+        (KIND_DELETE_ALL, 'Delete all rows of a table'),
+        (KIND_DELETE_AMENDMENT, 'Delete amendment'),
+        (KIND_UPLOAD, 'Create rows from an upload'),
+        (KIND_CHECK_REFERENCES, 'Check Dangerous Goods references'),
+    ]
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    id = models.BigAutoField(primary_key=True)
+    imdgamendment = models.ForeignKey(IMDGAmendment, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    errors = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['imdgamendment', 'kind', '-created_at'], name='job_amendment_kind_idx'),
+        ]
+        ordering = ['-created_at']
+        db_table = 'imdg.imdgjob'
+
+# Code-array fields of DangerousGoods and the code table each of them references.
+DANGEROUS_GOODS_CODE_FIELDS = {
+    'subsidiary_hazards': ('subsidiary_hazards_codes', ClassDivision),
+    'special_provisions': ('special_provisions_codes', SpecialProvisions),
+    'excepted_quantities': ('excepted_quantities_codes', ExceptedQuantities),
+    'packing_instructions': ('packing_instructions_codes', PackingInstructions),
+    'packing_provisions': ('packing_provisions_codes', PackingProvisions),
+    'ibc_instructions': ('ibc_instructions_codes', IBCInstructions),
+    'ibc_provisions': ('ibc_provisions_codes', IBCProvisions),
+    'tank_instructions': ('tank_instructions_codes', TankInstructions),
+    'tank_provisions': ('tank_provisions_codes', TankProvisions),
+    'emergency_schedules': ('emergency_schedules_codes', EmergencySchedules),
+    'stowage_handling': ('stowage_handling_codes', StowageHandling),
+    'segregation': ('segregation_codes', Segregation),
+}
+
+# Tables holding the content of an amendment, keyed by their API prefix, parents before children.
+# Each is LIST-partitioned on imdgamendment_id with one partition per amendment (see partitions.py).
+AMENDMENT_TABLES = {
+    'un-codes': UNCode,
+    'class-divisions': ClassDivision,
+    'packing-groups': PackingGroup,
+    'special-provisions': SpecialProvisions,
+    'excepted-quantities': ExceptedQuantities,
+    'packing-instructions': PackingInstructions,
+    'packing-provisions': PackingProvisions,
+    'ibc-instructions': IBCInstructions,
+    'ibc-provisions': IBCProvisions,
+    'tank-instructions': TankInstructions,
+    'tank-provisions': TankProvisions,
+    'emergency-schedules': EmergencySchedules,
+    'stowage-handling': StowageHandling,
+    'segregations': Segregation,
+    'segregation-rules': SegregationRule,
+    'dangerous-goods': DangerousGoods,
+}
+
+# Sent by bulk writes to an amendment table, which bypass post_save and post_delete.
+# The sender is the model written to; receivers get ``amendment_id``.
+amendment_content_changed = Signal()
@@ -1,30 +1,104 @@
+import base64
+import json
+import math
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework import status
+from django.db.models import Q
 
 class CustomPagination(PageNumberPagination):
+    """
+    Page-number pagination when 'page' is given, otherwise keyset pagination
+    on (upload_at, id) following the 'cursor' of the previous page.
+    Pass count=false to skip the COUNT(*) query in either mode.
+    """
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
 
     def paginate_queryset(self, queryset, request, view=None):
-        if 'page' not in request.query_params:
-            self.page = list(queryset)
-            self.request = request
-            return self.page
+        self.request = request
+        self.include_count = request.query_params.get(self.count_query_param, 'true').lower() not in ('0', 'false')
+        self.cursor_page = False
+        self.next_cursor = None
+
+        if 'page' not in request.query_params and not queryset.query.order_by:
+            return self.paginate_queryset_by_cursor(queryset, request)
+        if not self.include_count:
+            return self.paginate_queryset_without_count(queryset, request)
         return super().paginate_queryset(queryset, request, view)
 
+    def paginate_queryset_by_cursor(self, queryset, request):
+        self.cursor_page = True
+        self.page_size_value = self.get_page_size(request)
+        self.count = queryset.count() if self.include_count else None
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            upload_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(upload_at__lt=upload_at) | Q(upload_at=upload_at, pk__lt=pk))
+
+        rows = list(queryset.order_by('-upload_at', '-pk')[:self.page_size_value + 1])
+        self.page = rows[:self.page_size_value]
+        if len(rows) > self.page_size_value:
+            last = self.page[-1]
+            self.next_cursor = self.encode_cursor(last.upload_at, last.pk)
+        return self.page
+
+    def paginate_queryset_without_count(self, queryset, request):
+        self.page_size_value = self.get_page_size(request)
+        try:
+            self.page_number_value = max(int(request.query_params.get(self.page_query_param, 1)), 1)
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(page_number=request.query_params.get(self.page_query_param), message='That page number is not an integer'))
+
+        offset = (self.page_number_value - 1) * self.page_size_value
+        rows = list(queryset[offset:offset + self.page_size_value + 1])
+        self.page = rows[:self.page_size_value]
+        self.has_next_page = len(rows) > self.page_size_value
+        return self.page
+
+    def encode_cursor(self, upload_at, pk):
+        payload = json.dumps([upload_at.isoformat(), pk]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            upload_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            upload_at = parse_datetime(upload_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if upload_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return upload_at, pk
+
     def get_paginated_response(self, data):
-        if hasattr(self.page, 'paginator'):
+        if self.cursor_page:
+            url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+            count = self.count
+            total_pages = math.ceil(count / self.page_size_value) if count is not None else None
+            next_link = replace_query_param(url, self.cursor_query_param, self.next_cursor) if self.next_cursor else None
+            previous_link = None
+        elif hasattr(self.page, 'paginator'):
             total_pages = self.page.paginator.num_pages
             count = self.page.paginator.count
             next_link = self.get_next_link()
             previous_link = self.get_previous_link()
         else:
-            total_pages = 1
-            count = len(self.page)
-            next_link = None
+            url = self.request.build_absolute_uri()
+            total_pages = None
+            count = None
+            next_link = replace_query_param(url, self.page_query_param, self.page_number_value + 1) if self.has_next_page else None
             previous_link = None
+            if self.page_number_value > 1:
+                previous_link = replace_query_param(url, self.page_query_param, self.page_number_value - 1)
 
         return Response({
             'links': {
@@ -34,4 +108,4 @@ class CustomPagination(PageNumberPagination):
             'total_pages': total_pages,
             'count': count,
             'results': data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,93 @@
+import time
+from django.db import OperationalError, connection, transaction
+from .models import AMENDMENT_TABLES
+
+PARTITION_LOCK_TIMEOUT = '5s'
+PARTITION_LOCK_RETRIES = 5
+PARTITION_LOCK_RETRY_DELAY = 1
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def partition_name(model, amendment_id):
+    return f'{model._meta.db_table}_{amendment_id}'
+
+
+def _partition_exists(cursor, partition):
+    cursor.execute('SELECT to_regclass(%s)', [connection.ops.quote_name(partition)])
+    return cursor.fetchone()[0] is not None
+
+
+def _with_lock_timeout(cursor, work):
+    """
+    Run ``work`` in a transaction of its own under PARTITION_LOCK_TIMEOUT,
+    so DDL waiting for a lock behind a long query does not queue every
+    other query of the table behind it. Retries when the lock times out.
+    """
+    for attempt in range(1, PARTITION_LOCK_RETRIES + 1):
+        try:
+            with transaction.atomic():
+                cursor.execute("SELECT current_setting('lock_timeout'), set_config('lock_timeout', %s, true)", [PARTITION_LOCK_TIMEOUT])
+                previous = cursor.fetchone()[0]
+                result = work()
+                # Within a caller's transaction the setting would otherwise outlive this block.
+                cursor.execute("SELECT set_config('lock_timeout', %s, true)", [previous])
+                return result
+        except OperationalError as e:
+            if getattr(e.__cause__, 'pgcode', None) != LOCK_NOT_AVAILABLE or attempt == PARTITION_LOCK_RETRIES:
+                raise
+        time.sleep(PARTITION_LOCK_RETRY_DELAY * attempt)
+
+
+def create_amendment_partitions(amendment_id):
+    """
+    Create the partition of every amendment table for a new amendment. Each
+    partition is created as a standalone table and then attached, which
+    only takes a SHARE UPDATE EXCLUSIVE lock on the parent table, so reads
+    and writes of the other amendments carry on.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model in AMENDMENT_TABLES.values():
+            table = quote(model._meta.db_table)
+            partition = partition_name(model, amendment_id)
+
+            def attach():
+                if _partition_exists(cursor, partition):
+                    return
+                cursor.execute(
+                    f'CREATE TABLE {quote(partition)} '
+                    f'(LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS INCLUDING STORAGE)'
+                )
+                cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {quote(partition)} FOR VALUES IN ({int(amendment_id)})')
+
+            _with_lock_timeout(cursor, attach)
+
+
+def drop_amendment_partitions(amendment_id, progress=None):
+    """
+    Detach and drop the partitions of an amendment, children first, and
+    return the number of rows dropped per table. Rows that landed in a
+    default partition are left for a regular DELETE.
+    """
+    quote = connection.ops.quote_name
+    dropped = {}
+    with connection.cursor() as cursor:
+        for model in reversed(AMENDMENT_TABLES.values()):
+            partition = partition_name(model, amendment_id)
+
+            def detach():
+                if not _partition_exists(cursor, partition):
+                    return None
+                cursor.execute(f'SELECT count(*) FROM {quote(partition)}')
+                count = cursor.fetchone()[0]
+                cursor.execute(f'ALTER TABLE {quote(model._meta.db_table)} DETACH PARTITION {quote(partition)}')
+                cursor.execute(f'DROP TABLE {quote(partition)}')
+                return count
+
+            count = _with_lock_timeout(cursor, detach)
+            if count is None:
+                continue
+            dropped[model] = count
+            if progress:
+                progress(model, count)
+    return dropped
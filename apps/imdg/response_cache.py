@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import threading
+from functools import wraps
+import brotli
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.response import Response
+from .cache import get_active_amendment, get_content_generation
+from .conditional import preferred_encoding
+
+RESPONSE_CACHE_KEY = 'imdg:response:{amendment_id}:{version}:{digest}'
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+CACHEABLE_FORMATS = ('json',)
+
+
+class ResponseCacheStats:
+    """Per-worker hit/miss counters of the response blob cache."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+response_cache_stats = ResponseCacheStats()
+
+
+def build_entry(body, content_type):
+    """Store the rendered body with its gzip and brotli variants so hits never re-compress."""
+    return {
+        'content_type': content_type,
+        '': body,
+        'gzip': gzip.compress(body),
+        'br': brotli.compress(body),
+    }
+
+
+def entry_response(entry, request):
+    encoding = preferred_encoding(request)
+    response = HttpResponse(entry[encoding], content_type=entry['content_type'])
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def cached_response(view_method):
+    """
+    Serve a list endpoint from pre-rendered, pre-compressed bytes cached per
+    (absolute URL, amendment content generation). The URL includes scheme and
+    host because the cached pagination links are absolute. A write to the
+    amendment moves it to a new generation; old entries expire after
+    RESPONSE_CACHE_TIMEOUT.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        active_amendment = get_active_amendment()
+        renderer = getattr(request, 'accepted_renderer', None)
+        if not active_amendment or getattr(renderer, 'format', None) not in CACHEABLE_FORMATS:
+            return view_method(self, request, *args, **kwargs)
+
+        version, _ = get_content_generation(active_amendment.pk)
+        digest = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+        key = RESPONSE_CACHE_KEY.format(amendment_id=active_amendment.pk, version=version, digest=digest)
+
+        entry = cache.get(key)
+        if entry is not None:
+            response_cache_stats.record(hit=True)
+            return entry_response(entry, request)
+
+        response_cache_stats.record(hit=False)
+        response = view_method(self, request, *args, **kwargs)
+        if not isinstance(response, Response) or response.status_code != 200:
+            return response
+
+        renderer_context = {'request': request, 'response': response, 'view': self}
+        body = renderer.render(response.data, request.accepted_media_type, renderer_context)
+        content_type = f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type
+        entry = build_entry(body, content_type)
+        cache.set(key, entry, timeout=RESPONSE_CACHE_TIMEOUT)
+        return entry_response(entry, request)
+    return wrapper
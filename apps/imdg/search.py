@@ -0,0 +1,111 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q, Value, FloatField
+from .cache import GenerationMemo, get_active_amendment
+from .models import DangerousGoods
+
+SEARCH_CONFIG = 'english'
+TOKEN_PATTERN = re.compile(r'\w+')
+NON_WORD_PATTERN = re.compile(r'[^0-9a-z]+')
+TYPEAHEAD_FIELDS = ('id', 'un_code', 'proper_shipping_name', 'class_division_code', 'packing_group_code')
+
+
+def build_prefix_query(term):
+    """
+    Turn free text such as "lithium ion batt" into a tsquery where every word
+    must match and the words may be prefixes ("lithium:* & ion:* & batt:*").
+    """
+    tokens = TOKEN_PATTERN.findall(term.lower())
+    if not tokens:
+        return None
+    return SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_by_text(queryset, term):
+    """
+    Rank Dangerous Goods against the stored search vector of their proper
+    shipping name and observations, falling back to trigram similarity so
+    misspelled names still match.
+    """
+    query = build_prefix_query(term)
+    match = Q(proper_shipping_name__trigram_word_similar=term)
+    if query is not None:
+        match |= Q(search_vector=query)
+        rank = SearchRank(F('search_vector'), query)
+    else:
+        rank = Value(0.0, output_field=FloatField())
+    return queryset.annotate(
+        rank=rank,
+        similarity=TrigramWordSimilarity(term, 'proper_shipping_name'),
+    ).filter(match).order_by('-rank', '-similarity', 'id')
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse punctuation so "Lithium-ion" matches "lithium ion"."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return NON_WORD_PATTERN.sub(' ', text.lower()).strip()
+
+
+class PrefixIndex:
+    """
+    Sorted prefix index of the effective amendment's UN codes and proper
+    shipping names. Whole UN codes and names are searched first; every word
+    start inside a name is searched next so "ion batt" still finds
+    "LITHIUM ION BATTERIES".
+    """
+    def __init__(self, rows):
+        self.items = {}
+        primary = []
+        secondary = []
+        for row in rows:
+            self.items[row['id']] = row
+            if row['un_code']:
+                primary.append((row['un_code'].lower(), row['id']))
+            name = normalize(row['proper_shipping_name'])
+            if not name:
+                continue
+            primary.append((name, row['id']))
+            words = name.split(' ')
+            for position in range(1, len(words)):
+                secondary.append((' '.join(words[position:]), row['id']))
+        self._tiers = [self._sorted(primary), self._sorted(secondary)]
+
+    @staticmethod
+    def _sorted(entries):
+        entries.sort()
+        return [key for key, _ in entries], [item_id for _, item_id in entries]
+
+    @classmethod
+    def build(cls, amendment):
+        if not amendment:
+            return cls([])
+        return cls(DangerousGoods.objects.filter(imdgamendment=amendment).values(*TYPEAHEAD_FIELDS).iterator())
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        seen = set()
+        results = []
+        for keys, ids in self._tiers:
+            position = bisect_left(keys, prefix)
+            while position < len(keys) and keys[position].startswith(prefix):
+                item_id = ids[position]
+                position += 1
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                results.append(self.items[item_id])
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+prefix_index_memo = GenerationMemo(lambda generation: PrefixIndex.build(get_active_amendment()))
+
+
+def typeahead(prefix, limit=10):
+    """Return up to ``limit`` suggestions for a UN code or shipping name prefix."""
+    return prefix_index_memo.get().search(prefix, limit)
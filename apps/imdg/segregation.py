@@ -0,0 +1,117 @@
+from itertools import combinations
+from django.core.cache import cache
+from .cache import GenerationMemo, get_active_amendment
+from .models import DangerousGoods, SegregationRule
+
+MATRIX_KEY = 'imdg:segregation:matrix:{generation}'
+MATRIX_TIMEOUT = 60 * 60 * 24
+NO_RULE = 0
+
+
+class SegregationMatrix:
+    """
+    Dense segregation table of one amendment. Class divisions are mapped to
+    ordinals and ``cells[from * size + to]`` holds the requirement byte, or 0
+    when no rule exists for the pair.
+    """
+    __slots__ = ('codes', 'ordinals', 'size', 'cells')
+
+    def __init__(self, codes, cells):
+        self.codes = tuple(codes)
+        self.ordinals = {code: index for index, code in enumerate(self.codes)}
+        self.size = len(self.codes)
+        self.cells = bytes(cells)
+
+    @classmethod
+    def compile(cls, amendment):
+        if not amendment:
+            return cls((), b'')
+        rules = list(SegregationRule.objects.filter(
+            imdgamendment=amendment, fromclass__imdgamendment=amendment, toclass__imdgamendment=amendment,
+        ).values_list(
+            'fromclass__code', 'toclass__code', 'requirement'
+        ))
+        codes = sorted({code for rule in rules for code in rule[:2]})
+        ordinals = {code: index for index, code in enumerate(codes)}
+        size = len(codes)
+        cells = bytearray(size * size)
+        for from_code, to_code, requirement in rules:
+            cells[ordinals[from_code] * size + ordinals[to_code]] = ord(requirement)
+        return cls(codes, cells)
+
+    def requirement(self, from_code, to_code):
+        from_ordinal = self.ordinals.get(from_code)
+        to_ordinal = self.ordinals.get(to_code)
+        if from_ordinal is None or to_ordinal is None:
+            return None
+        value = self.cells[from_ordinal * self.size + to_ordinal]
+        return chr(value) if value != NO_RULE else None
+
+
+def _load_matrix(generation):
+    key = MATRIX_KEY.format(generation=generation)
+    cached = cache.get(key)
+    if cached is not None:
+        codes, cells = cached
+        return SegregationMatrix(codes, cells)
+    matrix = SegregationMatrix.compile(get_active_amendment())
+    cache.set(key, (matrix.codes, matrix.cells), timeout=MATRIX_TIMEOUT)
+    return matrix
+
+
+matrix_memo = GenerationMemo(_load_matrix)
+
+
+def get_segregation_matrix():
+    """Return the SegregationMatrix of the effective amendment for the current generation."""
+    return matrix_memo.get()
+
+
+def check_stowage_plan(un_codes):
+    """
+    Resolve the class divisions of every UN number in a stowage plan with one
+    query and return the segregation requirement of each pair of UN numbers,
+    or None for the pairs of class divisions the segregation table has no rule for.
+    """
+    amendment = get_active_amendment()
+    un_codes = list(dict.fromkeys(str(code).strip() for code in un_codes if code))
+    if not amendment or not un_codes:
+        return {'items': [], 'misses': un_codes, 'pairs': []}
+
+    classes_by_un_code = {}
+    rows = DangerousGoods.objects.filter(
+        imdgamendment=amendment, un_code__in=un_codes
+    ).values_list('un_code', 'class_division_code')
+    for un_code, class_code in rows:
+        class_codes = classes_by_un_code.setdefault(un_code, [])
+        if class_code and class_code not in class_codes:
+            class_codes.append(class_code)
+
+    matrix = get_segregation_matrix()
+    class_codes = {code for codes in classes_by_un_code.values() for code in codes}
+    requirements = {
+        (from_code, to_code): matrix.requirement(from_code, to_code)
+        for from_code in class_codes for to_code in class_codes
+    }
+
+    found = [code for code in un_codes if code in classes_by_un_code]
+    pairs = []
+    # Pairs are taken in UN number order, so the plan order does not change the result.
+    for from_un_code, to_un_code in combinations(sorted(found), 2):
+        for from_code in classes_by_un_code[from_un_code]:
+            for to_code in classes_by_un_code[to_un_code]:
+                # A rule may only be recorded one way round; a pair without any rule is reported as None.
+                requirement = requirements[(from_code, to_code)] or requirements[(to_code, from_code)]
+                pairs.append({
+                    'from_un_code': from_un_code,
+                    'to_un_code': to_un_code,
+                    'from_class_code': from_code,
+                    'to_class_code': to_code,
+                    'requirement': requirement,
+                })
+
+    return {
+        'items': [{'un_code': code, 'class_division_codes': classes_by_un_code[code]} for code in found],
+        'misses': [code for code in un_codes if code not in classes_by_un_code],
+        'pairs': pairs,
+    }
@@ -1,6 +1,7 @@
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from .services import IMDGLookupService
+from .jobs import with_live_progress
 from .models import (
     IMDGAmendment,
     UNCode,
@@ -19,8 +20,12 @@ from .models import (
     Segregation,
     SegregationRule,
     DangerousGoods,
+    IMDGJob,
+    amendment_content_changed,
 )
 
+BULK_CREATE_BATCH_SIZE = 1000
+
 class IMDGAmendmentSerializer(serializers.ModelSerializer):
     """Serializer for IMDGAmendment model."""
     class Meta:
@@ -33,22 +38,76 @@ class IMDGAmendmentSerializer(serializers.ModelSerializer):
 class BaseListSerializer(serializers.ListSerializer):
     """
     Custom ListSerializer to handle bulk creation with detailed error reporting.
+    Rows are inserted with bulk_create in batches; codes that already exist in
+    the active amendment, or repeat within the upload, are reported per index.
     """
+    batch_size = BULK_CREATE_BATCH_SIZE
+    duplicate_code_error = {'code': ['This code already exists in the current amendment.']}
+
     def create(self, validated_data):
         lookup_service = IMDGLookupService()
         if not lookup_service.active_amendment:
             raise serializers.ValidationError("No active amendment found.")
-        
+        active_amendment = lookup_service.active_amendment
+        model = self.child.Meta.model
+
+        errors = self.find_conflicts(model, active_amendment, validated_data)
+        pending = [
+            (idx, model(imdgamendment=active_amendment, **item_data))
+            for idx, item_data in enumerate(validated_data)
+            if errors[idx] is None
+        ]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in pending], batch_size=self.batch_size)
+        except IntegrityError:
+            # A concurrent upload inserted one of the codes after the pre-query; fall back to row by row.
+            return self.create_one_by_one(active_amendment, validated_data, errors)
+
+        instances = [None] * len(validated_data)
+        for idx, obj in pending:
+            instances[idx] = obj
+        if pending:
+            amendment_content_changed.send(sender=model, amendment_id=active_amendment.pk)
+
+        if not any(errors):
+            return instances
+
+        raise serializers.ValidationError({
+            'results': instances,
+            'errors': errors
+        })
+
+    def find_conflicts(self, model, active_amendment, validated_data):
+        """Return the per-index errors of codes already in the amendment or repeated in the upload, with one query."""
+        errors = [None] * len(validated_data)
+        if not any(field.name == 'code' for field in model._meta.fields):
+            return errors
+
+        codes = [item_data.get('code') for item_data in validated_data]
+        existing = set(
+            model.objects.filter(imdgamendment=active_amendment, code__in=[code for code in codes if code])
+            .values_list('code', flat=True)
+        )
+        for idx, code in enumerate(codes):
+            if code in existing:
+                errors[idx] = self.duplicate_code_error
+            else:
+                existing.add(code)
+        return errors
+
+    def create_one_by_one(self, active_amendment, validated_data, errors):
         instances = []
-        errors = []
         for idx, item_data in enumerate(validated_data):
-            item_data['imdgamendment'] = lookup_service.active_amendment
+            if errors[idx] is not None:
+                instances.append(None)
+                continue
+            item_data['imdgamendment'] = active_amendment
             try:
                 inst = self.child.create(item_data)
                 instances.append(inst)
-                errors.append(None)
             except serializers.ValidationError as exc:
-                errors.append(exc.detail)
+                errors[idx] = exc.detail
                 instances.append(None)
 
         if not any(errors):
@@ -59,6 +118,20 @@ class BaseListSerializer(serializers.ListSerializer):
             'errors': errors
         })
 
+class DangerousGoodsListSerializer(BaseListSerializer):
+    """
+    ListSerializer that resolves computed details for every item at once
+    when 'include_computed' is set in the context.
+    """
+    computed_details = None
+
+    def to_representation(self, data):
+        if self.context.get('include_computed'):
+            instances = list(data.all() if hasattr(data, 'all') else data)
+            self.computed_details = IMDGLookupService().get_computed_details_many(instances)
+            data = instances
+        return super().to_representation(data)
+
 class UNCodeSerializer(serializers.ModelSerializer):
     """Custom serializer for UNCode model with bulk creation support."""
     class Meta:
@@ -391,18 +464,57 @@ class SegregationSerializer(serializers.ModelSerializer):
                 'code': ['This code already exists in the current amendment.']
             }) from e
 
+class ClassDivisionCodeField(serializers.SlugRelatedField):
+    """
+    Class division code of the active amendment. Bulk uploads resolve codes
+    from the 'class_divisions' map loaded once by the list serializer.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(slug_field='code', **kwargs)
+
+    def get_queryset(self):
+        active_amendment = IMDGLookupService().active_amendment
+        if not active_amendment:
+            return ClassDivision.objects.none()
+        return ClassDivision.objects.filter(imdgamendment=active_amendment)
+
+    def to_internal_value(self, data):
+        class_divisions = self.context.get('class_divisions')
+        if class_divisions is None:
+            return super().to_internal_value(data)
+        try:
+            return class_divisions[str(data)]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=str(data))
+
+
+class SegregationRuleListSerializer(BaseListSerializer):
+    """
+    Validates a bulk upload of Segregation Rules against the active amendment
+    with two queries in total: its class divisions and its existing rules.
+    """
+    def to_internal_value(self, data):
+        active_amendment = IMDGLookupService().active_amendment
+        if active_amendment and isinstance(data, list):
+            self.context['class_divisions'] = {
+                class_division.code: class_division
+                for class_division in ClassDivision.objects.filter(imdgamendment=active_amendment)
+            }
+            if not self.context.get('upsert'):
+                self.context['segregation_pairs'] = set(
+                    SegregationRule.objects.filter(imdgamendment=active_amendment).values_list('fromclass_id', 'toclass_id')
+                )
+        return super().to_internal_value(data)
+
+
 class SegregationRuleSerializer(serializers.ModelSerializer):
     """Custom serializer for SegregationBar model."""
-    from_class_code = serializers.SlugRelatedField(
+    from_class_code = ClassDivisionCodeField(
         write_only=True,
-        slug_field='code',
-        queryset=ClassDivision.objects.all(),
         source='fromclass'
     )
-    to_class_code = serializers.SlugRelatedField(
+    to_class_code = ClassDivisionCodeField(
         write_only=True,
-        slug_field='code',
-        queryset=ClassDivision.objects.all(),
         source='toclass'
     )
     from_class = ClassDivisionSerializer(
@@ -419,7 +531,7 @@ class SegregationRuleSerializer(serializers.ModelSerializer):
                   'from_class_code', 'from_class',
                   'to_class_code', 'to_class',
                   'requirement']
-        list_serializer_class = BaseListSerializer
+        list_serializer_class = SegregationRuleListSerializer
 
     def validate(self, data):
         from_class_instance = data.get('fromclass')
@@ -431,11 +543,21 @@ class SegregationRuleSerializer(serializers.ModelSerializer):
         if not active_amendment:
              raise serializers.ValidationError("No active amendment found for validation.")
         
-        existing_rule = SegregationRule.objects.filter(
-            imdgamendment=active_amendment,
-            fromclass=from_class_instance,
-            toclass=to_class_instance
-        ).exists()
+        segregation_pairs = self.context.get('segregation_pairs')
+        if self.context.get('upsert'):
+            # Upserts update the existing rule of a pair instead of rejecting it.
+            existing_rule = False
+        elif segregation_pairs is not None:
+            # Bulk upload: check against the rules loaded once, including earlier rows of the upload.
+            pair = (from_class_instance.pk, to_class_instance.pk)
+            existing_rule = pair in segregation_pairs
+            segregation_pairs.add(pair)
+        else:
+            existing_rule = SegregationRule.objects.filter(
+                imdgamendment=active_amendment,
+                fromclass=from_class_instance,
+                toclass=to_class_instance
+            ).exists()
         
         if existing_rule:
             raise serializers.ValidationError(
@@ -475,13 +597,16 @@ class DangerousGoodsSerializer(serializers.ModelSerializer):
                   'segregation_codes',
                   'observations',
                   ]
-        list_serializer_class = BaseListSerializer
+        list_serializer_class = DangerousGoodsListSerializer
 
     def to_representation(self, instance):  
         representation = super().to_representation(instance)
         view = self.context.get('view')
 
-        if view and view.action == 'retrieve':
+        computed_details = getattr(self.parent, 'computed_details', None)
+        if computed_details is not None:
+            representation.update(computed_details.get(instance.pk, {}))
+        elif view and view.action == 'retrieve':
             lookup_service = IMDGLookupService()
             computed_data = lookup_service.get_computed_details(instance)
             representation.update(computed_data)
@@ -495,4 +620,22 @@ class DangerousGoodsSerializer(serializers.ModelSerializer):
         validated_data['imdgamendment'] = lookup_service.active_amendment
         return super().create(validated_data)
 
-
+class IMDGJobSerializer(serializers.ModelSerializer):
+    """Serializer for IMDGJob model."""
+    class Meta:
+        model = IMDGJob
+        fields = ['id',
+                  'imdgamendment',
+                  'kind',
+                  'status',
+                  'processed',
+                  'total',
+                  'result',
+                  'errors',
+                  'created_at',
+                  'started_at',
+                  'finished_at']
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        return super().to_representation(with_live_progress(instance))
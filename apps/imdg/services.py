@@ -1,15 +1,17 @@
-from .models import (
-    IMDGAmendment, DangerousGoods, ClassDivision, SegregationRule
-)
+from .cache import get_active_amendment
+from .snapshot import get_snapshot
+from .models import DangerousGoods, PackingGroup, UNCode, ClassDivision, DANGEROUS_GOODS_CODE_FIELDS
+
+# Single-code fields of a Dangerous Good resolved alongside its code arrays.
+DANGEROUS_GOODS_SINGLE_CODE_FIELDS = {
+    'un_code': ('un_code', UNCode),
+    'class_division': ('class_division_code', ClassDivision),
+    'packing_group': ('packing_group_code', PackingGroup),
+}
 
 class IMDGLookupService:
     def __init__(self):
-        try:
-            self.active_amendment = IMDGAmendment.objects.get(is_effective=True)
-        except IMDGAmendment.DoesNotExist:
-            self.active_amendment = None
-        except IMDGAmendment.MultipleObjectsReturned:
-            self.active_amendment = IMDGAmendment.objects.filter(is_effective=True).latest('upload_at')
+        self.active_amendment = get_active_amendment()
 
     def _find_related_object(self, model_class, code):
         if not code or not self.active_amendment: return None
@@ -23,29 +25,94 @@ class IMDGLookupService:
             return []
         return list(model_class.objects.filter(code__in=code_list, imdgamendment=self.active_amendment))
 
+    def get_by_un_codes(self, un_codes):
+        """Return the Dangerous Goods of the active amendment grouped by UN code, using one query."""
+        if not un_codes or not self.active_amendment:
+            return {}
+        grouped = {}
+        queryset = DangerousGoods.objects.filter(imdgamendment=self.active_amendment, un_code__in=un_codes)
+        for instance in queryset:
+            grouped.setdefault(instance.un_code, []).append(instance)
+        return grouped
+
+    def resolve_codes(self, dg_instances):
+        """
+        Expand the referenced codes of many Dangerous Goods into their
+        description and file, keyed by primary key. Every referenced table is
+        read with one ``code__in`` query; class divisions come from the snapshot.
+        """
+        if not self.active_amendment or not dg_instances: return {}
+        fields = {**DANGEROUS_GOODS_SINGLE_CODE_FIELDS, **DANGEROUS_GOODS_CODE_FIELDS}
+
+        wanted = {}
+        for field_name, model_class in fields.values():
+            codes = wanted.setdefault(model_class, set())
+            for instance in dg_instances:
+                codes.update(self._codes_of(instance, field_name))
+
+        snapshot = get_snapshot()
+        found = {}
+        for model_class, codes in wanted.items():
+            if model_class is ClassDivision:
+                found[model_class] = {code: snapshot.class_divisions[code] for code in codes if code in snapshot.class_divisions}
+            elif codes:
+                found[model_class] = {
+                    obj.code: obj
+                    for obj in model_class.objects.filter(code__in=codes, imdgamendment=self.active_amendment)
+                }
+            else:
+                found[model_class] = {}
+
+        resolved = {}
+        for instance in dg_instances:
+            entry = {}
+            for reference, (field_name, model_class) in fields.items():
+                objects = [found[model_class].get(code) for code in self._codes_of(instance, field_name)]
+                objects = [self._describe(obj) for obj in objects if obj is not None]
+                if reference in DANGEROUS_GOODS_SINGLE_CODE_FIELDS:
+                    objects = objects[0] if objects else None
+                entry[reference] = objects
+            resolved[instance.pk] = entry
+        return resolved
+
+    @staticmethod
+    def _codes_of(dg_instance, field_name):
+        value = getattr(dg_instance, field_name)
+        if isinstance(value, list):
+            return [code for code in value if code]
+        return [value] if value else []
+
+    @staticmethod
+    def _describe(obj):
+        file = getattr(obj, 'file', None) or getattr(obj, 'label', None)
+        return {
+            'id': obj.pk,
+            'code': obj.code,
+            'description': obj.description,
+            'file': file.url if file else None,
+        }
+
     def get_computed_details(self, dg_instance: DangerousGoods):
         if not self.active_amendment or not dg_instance: return {}
+        return self._compute_details(get_snapshot(), dg_instance)
 
-        primary_class = self._find_related_object(ClassDivision, dg_instance.class_division_code)
-        subsidiary_hazards = self._find_related_objects_from_list(ClassDivision, dg_instance.subsidiary_hazards_codes or [])
+    def get_computed_details_many(self, dg_instances):
+        """Return computed details of many Dangerous Goods keyed by primary key, sharing one snapshot."""
+        if not self.active_amendment or not dg_instances: return {}
+        snapshot = get_snapshot()
+        return {instance.pk: self._compute_details(snapshot, instance) for instance in dg_instances}
 
-        required_labels = []
-        if primary_class and primary_class.label:
-            required_labels.append(primary_class.label.url)
-        for sub_risk in subsidiary_hazards:
-            if sub_risk and sub_risk.label:
-                required_labels.append(sub_risk.label.url)
+    def _compute_details(self, snapshot, dg_instance):
+        primary_code = dg_instance.class_division_code
+        subsidiary_codes = dg_instance.subsidiary_hazards_codes
+        if not isinstance(subsidiary_codes, list):
+            subsidiary_codes = []
 
-        segregation_rules = []
-        if primary_class:
-            rules = SegregationRule.objects.filter(
-                imdgamendment=self.active_amendment,
-                fromclass=primary_class
-            ).select_related('toclass')
-            segregation_rules = [{'to_class_code': rule.toclass.code, 'requirement': rule.requirement} for rule in rules]
+        required_labels = snapshot.get_labels([primary_code] + list(dict.fromkeys(subsidiary_codes)))
+        segregation_rules = snapshot.get_segregation_rules(primary_code)
 
         return {
             'package_labels': required_labels,
             'ctu_placards': required_labels,
             'segregation_rules': segregation_rules
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.db import transaction
+from .cache import bump_generation, bump_content_generation, get_active_amendment
+from .tasks import request_materialization
+from .partitions import create_amendment_partitions, drop_amendment_partitions
+from .models import IMDGAmendment, AMENDMENT_TABLES, amendment_content_changed
+
+@receiver(post_save, sender=IMDGAmendment)
+@receiver(post_delete, sender=IMDGAmendment)
+def invalidate_active_amendment(sender, instance, **kwargs):
+    bump_generation()
+    bump_content_generation(instance.pk)
+
+@receiver(post_save, sender=IMDGAmendment)
+def create_partitions(sender, instance, created, **kwargs):
+    if created:
+        create_amendment_partitions(instance.pk)
+
+@receiver(post_delete, sender=IMDGAmendment)
+def drop_partitions(sender, instance, **kwargs):
+    drop_amendment_partitions(instance.pk)
+
+@receiver(post_save, sender=IMDGAmendment)
+def materialize_effective_amendment(sender, instance, **kwargs):
+    if instance.is_effective:
+        transaction.on_commit(lambda: request_materialization(instance.pk))
+
+def invalidate_amendment_content(sender, instance, **kwargs):
+    invalidate_amendment_table(sender, instance.imdgamendment_id)
+
+@receiver(amendment_content_changed)
+def invalidate_amendment_table(sender, amendment_id, **kwargs):
+    bump_generation()
+    bump_content_generation(amendment_id, tables=[sender._meta.model_name])
+    active_amendment = get_active_amendment()
+    if active_amendment and active_amendment.pk == amendment_id:
+        transaction.on_commit(lambda: request_materialization(amendment_id))
+
+for model in AMENDMENT_TABLES.values():
+    post_save.connect(invalidate_amendment_content, sender=model, dispatch_uid=f'imdg_invalidate_{model.__name__}_save')
+    post_delete.connect(invalidate_amendment_content, sender=model, dispatch_uid=f'imdg_invalidate_{model.__name__}_delete')
@@ -0,0 +1,64 @@
+from types import MappingProxyType
+from .cache import GenerationMemo, get_active_amendment
+from .models import ClassDivision, SegregationRule
+
+
+class IMDGSnapshot:
+    """
+    Immutable in-memory copy of the effective amendment's class divisions and
+    segregation matrix, used to compute DG details without touching the database.
+    """
+    __slots__ = ('amendment_id', 'generation', 'class_divisions', 'label_urls', 'segregation_rules')
+
+    def __init__(self, amendment_id, generation, class_divisions, label_urls, segregation_rules):
+        object.__setattr__(self, 'amendment_id', amendment_id)
+        object.__setattr__(self, 'generation', generation)
+        object.__setattr__(self, 'class_divisions', MappingProxyType(class_divisions))
+        object.__setattr__(self, 'label_urls', MappingProxyType(label_urls))
+        object.__setattr__(self, 'segregation_rules', MappingProxyType(segregation_rules))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("IMDGSnapshot is immutable.")
+
+    @classmethod
+    def build(cls, amendment, generation):
+        if not amendment:
+            return cls(None, generation, {}, {}, {})
+
+        class_divisions = {
+            class_division.code: class_division
+            for class_division in ClassDivision.objects.filter(imdgamendment=amendment)
+        }
+        label_urls = {
+            code: class_division.label.url
+            for code, class_division in class_divisions.items()
+            if class_division.label
+        }
+
+        segregation_rules = {}
+        rules = SegregationRule.objects.filter(
+            imdgamendment=amendment, fromclass__imdgamendment=amendment, toclass__imdgamendment=amendment,
+        ).values_list(
+            'fromclass__code', 'toclass__code', 'requirement'
+        )
+        for from_code, to_code, requirement in rules:
+            segregation_rules.setdefault(from_code, []).append(
+                MappingProxyType({'to_class_code': to_code, 'requirement': requirement})
+            )
+        segregation_rules = {code: tuple(items) for code, items in segregation_rules.items()}
+
+        return cls(amendment.pk, generation, class_divisions, label_urls, segregation_rules)
+
+    def get_labels(self, codes):
+        return [self.label_urls[code] for code in codes if code in self.label_urls]
+
+    def get_segregation_rules(self, class_code):
+        return [dict(rule) for rule in self.segregation_rules.get(class_code, ())]
+
+
+snapshot_memo = GenerationMemo(lambda generation: IMDGSnapshot.build(get_active_amendment(), generation))
+
+
+def get_snapshot():
+    """Return the IMDGSnapshot of the effective amendment for the current generation."""
+    return snapshot_memo.get()
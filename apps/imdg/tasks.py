@@ -0,0 +1,100 @@
+import os
+from celery import shared_task
+from django.core.cache import cache
+from .cache import get_active_amendment
+from .cloning import clone_amendment
+from .deletion import delete_amendment_rows, delete_table_rows
+from .imports import import_bundle
+from .integrity import check_amendment_references
+from .jobs import create_job, run_job, update_progress
+from .materialize import MATERIALIZE_CLAIMED, MATERIALIZE_DEBOUNCE, MATERIALIZE_PENDING_KEY, materialize
+from .models import IMDGAmendment, IMDGJob
+from .uploads import create_rows
+
+
+@shared_task
+def materialize_amendment(job_id):
+    return run_job(job_id, materialize)
+
+
+def request_materialization(amendment_id, countdown=MATERIALIZE_DEBOUNCE):
+    """
+    Queue a rebuild of the expanded Dangerous Goods of an amendment after
+    ``countdown`` seconds and return the job id. Requests made while a
+    rebuild is pending share its job, so a burst of writes builds once; they
+    get None while the first request is still creating it.
+    Only the effective amendment is materialized.
+    """
+    active_amendment = get_active_amendment()
+    if not active_amendment or active_amendment.pk != amendment_id:
+        return None
+
+    key = MATERIALIZE_PENDING_KEY.format(amendment_id=amendment_id)
+    # Claim the slot atomically; the claim holds no job id until the job exists.
+    if not cache.add(key, MATERIALIZE_CLAIMED, timeout=countdown + 60):
+        return cache.get(key) or None
+
+    job = create_job(IMDGJob.KIND_MATERIALIZE, amendment_id)
+    cache.set(key, job.pk, timeout=countdown + 60)
+    materialize_amendment.apply_async(args=[job.pk], countdown=countdown)
+    return job.pk
+
+
+@shared_task
+def import_amendment_bundle(job_id, path, name, activate=False, allow_dangling=False):
+    def work(job):
+        result = import_bundle(
+            path, name, activate=activate, allow_dangling=allow_dangling,
+            progress=lambda processed, total: update_progress(job, processed, total),
+        )
+        job.imdgamendment_id = result['imdgamendment']
+        return result
+
+    try:
+        return run_job(job_id, work)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@shared_task
+def clone_amendment_content(job_id, source_id, name):
+    def work(job):
+        source = IMDGAmendment.objects.get(pk=source_id)
+        result = clone_amendment(
+            source, name,
+            progress=lambda processed, total: update_progress(job, processed, total),
+        )
+        job.imdgamendment_id = result['imdgamendment']
+        return result
+
+    return run_job(job_id, work)
+
+
+@shared_task
+def delete_all_rows(job_id, table):
+    return run_job(job_id, lambda job: delete_table_rows(job, table))
+
+
+@shared_task
+def delete_amendment(job_id):
+    return run_job(job_id, delete_amendment_rows)
+
+
+@shared_task
+def create_uploaded_rows(job_id, table, path):
+    try:
+        return run_job(job_id, lambda job: create_rows(job, table, path))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@shared_task
+def check_references(job_id):
+    def work(job):
+        report = check_amendment_references(job.imdgamendment_id)
+        job.errors = report['references']
+        return {'imdgamendment': report['imdgamendment'], 'counts': report['counts']}
+
+    return run_job(job_id, work)
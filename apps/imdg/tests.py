@@ -0,0 +1,319 @@
+from unittest import mock
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from .models import (
+    IMDGAmendment,
+    UNCode,
+    ClassDivision,
+    PackingGroup,
+    SpecialProvisions,
+    PackingInstructions,
+    SegregationRule,
+    DangerousGoods,
+    DANGEROUS_GOODS_CODE_FIELDS,
+    AMENDMENT_TABLES,
+    IMDGJob,
+)
+from .cloning import clone_amendment
+from .deletion import delete_amendment_rows
+from .integrity import check_amendment_references
+from .jobs import create_job
+from .materialize import MATERIALIZE_CLAIMED, MATERIALIZE_PENDING_KEY
+from .partitions import partition_name
+from .segregation import check_stowage_plan
+from .services import IMDGLookupService
+from .tasks import request_materialization
+
+CLASS_CODES = ['1.1', '2.1', '3', '4.1', '5.1', '6.1', '8', '9']
+SHIPPING_NAMES = ['ACETONE', 'PAINT', 'ETHANOL SOLUTION', 'HYDROGEN PEROXIDE']
+
+
+def create_amendment(name='2024', dangerous_goods=100, un_codes=('1203',)):
+    """
+    Create an effective amendment whose Dangerous Goods take their UN number
+    from ``un_codes`` in turn. One in a hundred is GASOLINE with special provision 274.
+    """
+    amendment = IMDGAmendment.objects.create(name=name, is_effective=True)
+    class_divisions = [ClassDivision.objects.create(imdgamendment=amendment, code=code) for code in CLASS_CODES]
+    SegregationRule.objects.bulk_create([
+        SegregationRule(imdgamendment=amendment, fromclass=from_class, toclass=to_class, requirement='X')
+        for from_class in class_divisions for to_class in class_divisions
+    ])
+    UNCode.objects.bulk_create([UNCode(imdgamendment=amendment, code=code) for code in un_codes])
+    PackingGroup.objects.bulk_create([PackingGroup(imdgamendment=amendment, code=code) for code in ('I', 'II', 'III')])
+    SpecialProvisions.objects.bulk_create([SpecialProvisions(imdgamendment=amendment, code=code) for code in ('223', '274')])
+    DangerousGoods.objects.bulk_create([
+        DangerousGoods(
+            imdgamendment=amendment,
+            un_code=un_codes[i % len(un_codes)],
+            proper_shipping_name='GASOLINE' if i % 100 == 0 else SHIPPING_NAMES[i % len(SHIPPING_NAMES)],
+            class_division_code=CLASS_CODES[i % len(CLASS_CODES)],
+            subsidiary_hazards_codes=[CLASS_CODES[(i + 1) % len(CLASS_CODES)]],
+            packing_group_code='II',
+            special_provisions_codes=['274'] if i % 100 == 0 else ['223'],
+        )
+        for i in range(dangerous_goods)
+    ])
+    return amendment
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class IMDGTestCase(TestCase):
+    def setUp(self):
+        # The local memory cache of this process, never the shared Redis.
+        cache.clear()
+        patcher = mock.patch('apps.imdg.signals.request_materialization')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        user = get_user_model().objects.create_superuser(email='admin@example.com', first_name='Admin', last_name='User', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+
+class ComputedDetailsQueryCountTests(IMDGTestCase):
+    """Computed details are resolved in bulk, so a page costs the same number of queries at any size."""
+    def setUp(self):
+        super().setUp()
+        self.amendment = create_amendment(dangerous_goods=100)
+
+    def assertSameQueryCount(self, url):
+        # Warm the active amendment and snapshot caches, which are shared by both sizes.
+        self.client.get(url.format(size=2))
+        counts = []
+        for size in (1, 100):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url.format(size=size))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_dangerous_goods_list(self):
+        self.assertSameQueryCount('/api/imdg/dangerous-goods/?page=1&page_size={size}&computed=1')
+
+    def test_search_dangerous_goods(self):
+        self.assertSameQueryCount('/api/imdg/search-dangerous-goods/?search=1203&page=1&page_size={size}&computed=1')
+
+    def test_get_computed_details_many(self):
+        service = IMDGLookupService()
+        instances = list(DangerousGoods.objects.filter(imdgamendment=self.amendment))
+        service.get_computed_details_many(instances[:2])
+        counts = []
+        for size in (1, 100):
+            with CaptureQueriesContext(connection) as queries:
+                details = service.get_computed_details_many(instances[:size])
+            self.assertEqual(len(details), size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_get_computed_details_warm(self):
+        service = IMDGLookupService()
+        instances = list(DangerousGoods.objects.filter(imdgamendment=self.amendment)[:10])
+        # The first call loads the snapshot; every later one is served from memory.
+        service.get_computed_details(instances[0])
+        with self.assertNumQueries(0):
+            for instance in instances:
+                self.assertTrue(service.get_computed_details(instance)['segregation_rules'])
+
+
+class ResolveCodesQueryCountTests(IMDGTestCase):
+    """resolve_codes reads every referenced table once and class divisions from the snapshot."""
+    def setUp(self):
+        super().setUp()
+        amendment = create_amendment(dangerous_goods=100, un_codes=('1203', '1090'))
+        PackingInstructions.objects.create(imdgamendment=amendment, code='P001')
+        DangerousGoods.objects.filter(imdgamendment=amendment).update(packing_instructions_codes=['P001'])
+        self.instances = list(DangerousGoods.objects.filter(imdgamendment=amendment))
+        self.service = IMDGLookupService()
+        # Warm the snapshot the class divisions are read from.
+        self.service.resolve_codes(self.instances[:1])
+
+    def queries_per_table(self, instances):
+        with CaptureQueriesContext(connection) as queries:
+            resolved = self.service.resolve_codes(instances)
+        self.assertEqual(len(resolved), len(instances))
+        models = [UNCode, ClassDivision, PackingGroup, SpecialProvisions, PackingInstructions]
+        counts = {
+            model: sum(f'FROM {connection.ops.quote_name(model._meta.db_table)}' in query['sql'] for query in queries)
+            for model in models
+        }
+        return counts, len(queries)
+
+    def test_one_query_per_referenced_table(self):
+        counts, total = self.queries_per_table(self.instances)
+        self.assertEqual(counts, {
+            UNCode: 1, ClassDivision: 0, PackingGroup: 1, SpecialProvisions: 1, PackingInstructions: 1,
+        })
+        self.assertEqual(total, 4)
+
+    def test_same_queries_for_one_and_many(self):
+        self.assertEqual(self.queries_per_table(self.instances[:1]), self.queries_per_table(self.instances))
+
+
+def index_names(index_name):
+    """An index and the indexes of its partitions, which are the ones EXPLAIN names."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = %s',
+            [index_name],
+        )
+        return {index_name} | {row[0] for row in cursor.fetchall()}
+
+
+class LookupIndexTests(IMDGTestCase):
+    """The lookups of the API are served by the indexes added for them."""
+    def setUp(self):
+        super().setUp()
+        self.amendment = create_amendment(dangerous_goods=2000, un_codes=[str(code) for code in range(1000, 3000)])
+        with connection.cursor() as cursor:
+            for model in AMENDMENT_TABLES.values():
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+            # Test tables are small enough to read whole; this still fails when no index can serve a lookup.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names(index_name)), f'{index_name} not used:\n{plan}')
+
+    def test_un_code_by_code(self):
+        self.assertUsesIndex(UNCode.objects.filter(imdgamendment=self.amendment, code='1203'), 'unique_imdgamendment_uncode')
+
+    def test_dangerous_goods_by_un_code(self):
+        self.assertUsesIndex(DangerousGoods.objects.filter(imdgamendment=self.amendment, un_code='1203'), 'dg_amendment_uncode_idx')
+
+    def test_dangerous_goods_by_reference(self):
+        for reference, (field_name, _) in DANGEROUS_GOODS_CODE_FIELDS.items():
+            with self.subTest(reference=reference):
+                index_name = next(index.name for index in DangerousGoods._meta.indexes if index.fields == [field_name])
+                queryset = DangerousGoods.objects.filter(imdgamendment=self.amendment, **{f'{field_name}__contains': ['274']})
+                self.assertUsesIndex(queryset, index_name)
+
+    def test_dangerous_goods_first_page(self):
+        queryset = DangerousGoods.objects.filter(imdgamendment=self.amendment).order_by('-upload_at', '-id')[:50]
+        self.assertUsesIndex(queryset, 'dg_amendment_keyset_idx')
+
+    def test_dangerous_goods_text_search(self):
+        queryset = DangerousGoods.objects.filter(
+            imdgamendment=self.amendment, search_vector=SearchQuery('gasoline', config='english'),
+        )
+        self.assertUsesIndex(queryset, 'dg_search_vector_gin')
+
+    def test_dangerous_goods_trigram_search(self):
+        queryset = DangerousGoods.objects.filter(
+            imdgamendment=self.amendment, proper_shipping_name__trigram_word_similar='gasolin',
+        )
+        self.assertUsesIndex(queryset, 'dg_shipping_name_trgm')
+
+
+class ReferenceCheckTests(IMDGTestCase):
+    def test_counts_are_not_limited(self):
+        amendment = create_amendment(dangerous_goods=10)
+        DangerousGoods.objects.filter(imdgamendment=amendment).update(packing_instructions_codes=['P001'])
+        report = check_amendment_references(amendment.pk, limit=3)
+        self.assertEqual(report['counts'], {'packing_instructions': 10})
+        self.assertEqual(len(report['references']), 3)
+
+
+class MaterializationRequestTests(IMDGTestCase):
+    @mock.patch('apps.imdg.tasks.materialize_amendment.apply_async')
+    def test_pending_rebuild_is_shared(self, apply_async):
+        amendment = create_amendment(dangerous_goods=1)
+        job_id = request_materialization(amendment.pk)
+        self.assertEqual(request_materialization(amendment.pk), job_id)
+        self.assertEqual(IMDGJob.objects.filter(kind=IMDGJob.KIND_MATERIALIZE).count(), 1)
+        apply_async.assert_called_once_with(args=[job_id], countdown=mock.ANY)
+
+    @mock.patch('apps.imdg.tasks.materialize_amendment.apply_async')
+    def test_claimed_slot_queues_nothing(self, apply_async):
+        amendment = create_amendment(dangerous_goods=1)
+        # Another worker has claimed the slot and not created its job yet.
+        cache.add(MATERIALIZE_PENDING_KEY.format(amendment_id=amendment.pk), MATERIALIZE_CLAIMED)
+        self.assertIsNone(request_materialization(amendment.pk))
+        self.assertFalse(IMDGJob.objects.filter(kind=IMDGJob.KIND_MATERIALIZE).exists())
+        apply_async.assert_not_called()
+
+
+class PartitionLifecycleTests(IMDGTestCase):
+    """Every amendment has a partition per table, which goes away with the amendment."""
+    def partitions(self, amendment_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT p.relname FROM pg_inherits i '
+                'JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent '
+                'WHERE c.relname = ANY(%s)',
+                [[partition_name(model, amendment_id) for model in AMENDMENT_TABLES.values()]],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def default_rows(self, amendment_id):
+        with connection.cursor() as cursor:
+            counts = []
+            for model in AMENDMENT_TABLES.values():
+                default = connection.ops.quote_name(f'{model._meta.db_table}_default')
+                cursor.execute(f'SELECT count(*) FROM {default} WHERE imdgamendment_id = %s', [amendment_id])
+                counts.append(cursor.fetchone()[0])
+            return sum(counts)
+
+    def test_amendment_has_partitions(self):
+        amendment = create_amendment(dangerous_goods=10)
+        self.assertEqual(self.partitions(amendment.pk), {model._meta.db_table for model in AMENDMENT_TABLES.values()})
+        self.assertEqual(self.default_rows(amendment.pk), 0)
+
+    def test_delete_drops_partitions(self):
+        amendment = create_amendment(dangerous_goods=10)
+        job = create_job(IMDGJob.KIND_DELETE_AMENDMENT, amendment.pk)
+        # The rows were inserted in this test's transaction; a partition cannot be dropped under pending checks.
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        result = delete_amendment_rows(job)
+        self.assertEqual(result['rows']['dangerousgoods'], 10)
+        self.assertEqual(self.partitions(amendment.pk), set())
+        self.assertEqual(self.default_rows(amendment.pk), 0)
+        self.assertFalse(IMDGAmendment.objects.filter(pk=amendment.pk).exists())
+
+    def test_failed_clone_drops_partitions(self):
+        source = create_amendment(dangerous_goods=10)
+        with mock.patch('apps.imdg.cloning._clone_table', side_effect=RuntimeError('copy failed')):
+            with self.assertRaises(RuntimeError):
+                clone_amendment(source, '2026')
+        amendment_ids = set(IMDGAmendment.objects.values_list('pk', flat=True))
+        self.assertEqual(amendment_ids, {source.pk})
+        self.assertEqual(self.partitions(source.pk + 1), set())
+
+
+class StowagePlanTests(IMDGTestCase):
+    def setUp(self):
+        super().setUp()
+        amendment = create_amendment(dangerous_goods=0)
+        class_divisions = {division.code: division for division in ClassDivision.objects.filter(imdgamendment=amendment)}
+        SegregationRule.objects.filter(imdgamendment=amendment).delete()
+        # Only recorded from class 8 to class 3.
+        SegregationRule.objects.create(
+            imdgamendment=amendment, fromclass=class_divisions['8'], toclass=class_divisions['3'], requirement='2',
+        )
+        DangerousGoods.objects.bulk_create([
+            DangerousGoods(imdgamendment=amendment, un_code=un_code, class_division_code=class_code)
+            for un_code, class_code in (('1203', '3'), ('1789', '8'), ('1005', '2.1'))
+        ])
+
+    def requirements(self, result):
+        return {frozenset((pair['from_un_code'], pair['to_un_code'])): pair['requirement'] for pair in result['pairs']}
+
+    def test_rule_applies_both_ways(self):
+        requirements = self.requirements(check_stowage_plan(['1203', '1789']))
+        self.assertEqual(requirements, {frozenset(('1203', '1789')): '2'})
+
+    def test_pairs_without_rule_are_reported(self):
+        requirements = self.requirements(check_stowage_plan(['1203', '1005']))
+        self.assertEqual(requirements, {frozenset(('1203', '1005')): None})
+
+    def test_plan_order_does_not_matter(self):
+        plan = ['1203', '1789', '1005']
+        self.assertEqual(check_stowage_plan(plan)['pairs'], check_stowage_plan(plan[::-1])['pairs'])
@@ -0,0 +1,192 @@
+import codecs
+import json
+import re
+from rest_framework import serializers
+from .cache import get_active_amendment
+from .jobs import update_progress
+from .serializers import (
+    BULK_CREATE_BATCH_SIZE,
+    UNCodeSerializer,
+    ClassDivisionSerializer,
+    PackingGroupSerializer,
+    SpecialProvisionsSerializer,
+    ExceptedQuantitiesSerializer,
+    PackingInstructionsSerializer,
+    PackingProvisionsSerializer,
+    IBCInstructionsSerializer,
+    IBCProvisionsSerializer,
+    TankInstructionsSerializer,
+    TankProvisionsSerializer,
+    EmergencySchedulesSerializer,
+    StowageHandlingSerializer,
+    SegregationSerializer,
+    SegregationRuleSerializer,
+    DangerousGoodsSerializer,
+)
+
+UPLOAD_READ_SIZE = 64 * 1024
+UPLOAD_MAX_ROW_SIZE = 1024 * 1024
+UPLOAD_ERRORS_LIMIT = 1000
+UPLOAD_SERIALIZERS = {
+    'un-codes': UNCodeSerializer,
+    'class-divisions': ClassDivisionSerializer,
+    'packing-groups': PackingGroupSerializer,
+    'special-provisions': SpecialProvisionsSerializer,
+    'excepted-quantities': ExceptedQuantitiesSerializer,
+    'packing-instructions': PackingInstructionsSerializer,
+    'packing-provisions': PackingProvisionsSerializer,
+    'ibc-instructions': IBCInstructionsSerializer,
+    'ibc-provisions': IBCProvisionsSerializer,
+    'tank-instructions': TankInstructionsSerializer,
+    'tank-provisions': TankProvisionsSerializer,
+    'emergency-schedules': EmergencySchedulesSerializer,
+    'stowage-handling': StowageHandlingSerializer,
+    'segregations': SegregationSerializer,
+    'segregation-rules': SegregationRuleSerializer,
+    'dangerous-goods': DangerousGoodsSerializer,
+}
+WHITESPACE = re.compile(r'\s*')
+NUMBER_CHARACTERS = '0123456789+-.eE'
+
+
+class UploadError(Exception):
+    """Raised when an upload cannot be read any further; ``errors`` lists the problems."""
+    def __init__(self, errors):
+        super().__init__('; '.join(error['detail'] for error in errors))
+        self.errors = errors
+
+
+def iter_json_array(stream, read_size=UPLOAD_READ_SIZE):
+    """
+    Yield the elements of the JSON array in the binary ``stream`` one at a
+    time, reading ``read_size`` bytes at a time, so only the current element
+    and the unread rest of one read are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof = '', 0, False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        if len(buffer) - pos > UPLOAD_MAX_ROW_SIZE:
+            raise UploadError([{'index': index, 'detail': f'Row {index} is not valid JSON within {UPLOAD_MAX_ROW_SIZE} bytes.'}])
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+    def next_token():
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return ''
+            read_more()
+
+    if next_token() != '[':
+        raise UploadError([{'detail': 'Expected a JSON array of rows.'}])
+    pos += 1
+    index = 0
+    while True:
+        if next_token() == ']':
+            if index:
+                raise UploadError([{'index': index, 'detail': f"Row {index}: expected a row after ','."}])
+            pos += 1
+            break
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise UploadError([{'index': index, 'detail': f'Row {index}: {e.msg}.'}])
+                read_more()
+                continue
+            # A number cut short by the end of the buffer still decodes; read on until it is followed by something else.
+            if not eof and (end == len(buffer) or buffer[end] in NUMBER_CHARACTERS):
+                read_more()
+                continue
+            break
+        pos = end
+        yield value
+        index += 1
+        token = next_token()
+        pos += 1
+        if token == ']':
+            break
+        if token != ',':
+            raise UploadError([{'index': index, 'detail': f"Row {index}: expected ',' or ']' after the previous row."}])
+    if next_token():
+        raise UploadError([{'detail': 'Unexpected content after the JSON array.'}])
+
+
+def _batches(rows, size):
+    batch = []
+    start = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield start, batch
+            start += size
+            batch = []
+    if batch:
+        yield start, batch
+
+
+def _create_batch(serializer_class, rows):
+    """
+    Validate and bulk create one batch of rows, skipping the invalid ones.
+    Returns the number of rows created and the ``(index, errors)`` of the others.
+    """
+    errors = {}
+    pending = list(range(len(rows)))
+    while pending:
+        # A fresh serializer per pass, so lookups preloaded by the list serializer are not reused.
+        serializer = serializer_class(data=[rows[idx] for idx in pending], many=True)
+        if serializer.is_valid():
+            break
+        failed = {idx: error for idx, error in zip(pending, serializer.errors) if error}
+        if not isinstance(serializer.errors, list) or not failed:
+            failed = {idx: serializer.errors for idx in pending}
+        errors.update(failed)
+        pending = [idx for idx in pending if idx not in failed]
+    if not pending:
+        return 0, sorted(errors.items())
+
+    try:
+        serializer.save()
+    except serializers.ValidationError as e:
+        # Rows that were created come back as the string 'None' in the errors list.
+        for idx, error in zip(pending, e.detail['errors']):
+            if not isinstance(error, str):
+                errors[idx] = error
+    return len(rows) - len(errors), sorted(errors.items())
+
+
+def create_rows(job, table, path):
+    """
+    Create the rows of the JSON array uploaded to ``path`` in ``table`` of
+    the job's amendment, validating and inserting batches of
+    BULK_CREATE_BATCH_SIZE rows, one transaction each. Invalid rows are
+    skipped and listed in the job errors with their index in the upload.
+    """
+    active_amendment = get_active_amendment()
+    if not active_amendment or active_amendment.pk != job.imdgamendment_id:
+        raise UploadError([{'detail': 'The effective IMDG Amendment changed after the upload.'}])
+
+    serializer_class = UPLOAD_SERIALIZERS[table]
+    created = failed = 0
+    # Shared with the job, so the rows rejected so far are kept if reading fails halfway.
+    job.errors = []
+    with open(path, 'rb') as stream:
+        for start, batch in _batches(iter_json_array(stream), BULK_CREATE_BATCH_SIZE):
+            batch_created, batch_errors = _create_batch(serializer_class, batch)
+            created += batch_created
+            failed += len(batch_errors)
+            for idx, error in batch_errors:
+                if len(job.errors) < UPLOAD_ERRORS_LIMIT:
+                    job.errors.append({'index': start + idx, 'errors': error})
+            update_progress(job, start + len(batch))
+    update_progress(job, job.processed, total=job.processed)
+    return {'table': table, 'created': created, 'failed': failed}
@@ -0,0 +1,196 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import DangerousGoods, SegregationRule, amendment_content_changed
+
+UPSERT_BATCH_SIZE = 1000
+UPSERT_LIMIT = 5000
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+# The CTEs share one snapshot, so "existing" holds the rows as they were before the insert.
+UPSERT_SQL = """
+    WITH existing AS (
+        SELECT id FROM {table} WHERE imdgamendment_id = %s AND {lookup} = ANY(%s)
+    ), written AS (
+        INSERT INTO {table} AS t ({columns}) VALUES {values}
+        ON CONFLICT ({conflict}) DO {action}
+        RETURNING {keys}, t.id
+    )
+    SELECT w.*, NOT EXISTS (SELECT 1 FROM existing e WHERE e.id = w.id) FROM written w
+"""
+
+
+def natural_key(model):
+    """Fields identifying a row of ``model`` within an amendment."""
+    if model is DangerousGoods:
+        return ('un_code', 'packing_group_code')
+    if model is SegregationRule:
+        return ('fromclass', 'toclass')
+    return ('code',)
+
+
+def _key_of(model, item):
+    if model is DangerousGoods:
+        return (item.get('un_code'), item.get('packing_group_code') or '')
+    values = tuple(item.get(name) for name in natural_key(model))
+    return tuple(getattr(value, 'pk', value) for value in values)
+
+
+def find_upsert_errors(model, rows):
+    """Return the per-index errors of rows without a natural key or repeating one, or None when every row is usable."""
+    errors = [None] * len(rows)
+    required = ('un_code',) if model is DangerousGoods else natural_key(model)
+    seen = set()
+    for idx, item in enumerate(rows):
+        missing = [name for name in required if item.get(name) in (None, '')]
+        if missing:
+            errors[idx] = {name: ['This field is required to match existing rows.'] for name in missing}
+            continue
+        key = _key_of(model, item)
+        if key in seen:
+            errors[idx] = {'non_field_errors': ['This row repeats the key of an earlier row.']}
+        seen.add(key)
+    return errors if any(errors) else None
+
+
+def _upsert_batch(cursor, model, amendment, fields, batch):
+    """
+    Upsert one batch of rows sharing the same ``fields`` with a single
+    INSERT ... ON CONFLICT DO UPDATE. The update only applies when the
+    content differs, so unchanged rows are neither written nor returned.
+    """
+    quote = connection.ops.quote_name
+    key_fields = [model._meta.get_field(name) for name in natural_key(model)]
+    value_fields = [model._meta.get_field(name) for name in fields if name not in natural_key(model)]
+    upload_at = model._meta.get_field('upload_at')
+    insert_fields = key_fields + value_fields
+
+    columns = ['imdgamendment_id'] + [field.column for field in insert_fields] + [upload_at.column]
+    placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    lookup = key_fields[0]
+    params = [amendment.pk, list({
+        lookup.get_db_prep_save(getattr(model(**item), lookup.attname), connection) for item in batch
+    })]
+    now = timezone.now()
+    for item in batch:
+        obj = model(imdgamendment=amendment, **item)
+        params.append(amendment.pk)
+        params += [field.get_db_prep_save(getattr(obj, field.attname), connection) for field in insert_fields]
+        params.append(upload_at.get_db_prep_save(now, connection))
+
+    if value_fields:
+        assignments = ', '.join(f'{quote(field.column)} = EXCLUDED.{quote(field.column)}' for field in value_fields)
+        current = ', '.join(f't.{quote(field.column)}' for field in value_fields)
+        excluded = ', '.join(f'EXCLUDED.{quote(field.column)}' for field in value_fields)
+        action = f'UPDATE SET {assignments} WHERE ROW({current}) IS DISTINCT FROM ROW({excluded})'
+    else:
+        action = 'NOTHING'
+    cursor.execute(
+        UPSERT_SQL.format(
+            table=quote(model._meta.db_table),
+            lookup=quote(lookup.column),
+            columns=', '.join(quote(column) for column in columns),
+            values=', '.join([placeholders] * len(batch)),
+            conflict=', '.join(['imdgamendment_id'] + [quote(field.column) for field in key_fields]),
+            action=action,
+            keys=', '.join(f't.{quote(field.column)}' for field in key_fields),
+        ),
+        params,
+    )
+    width = len(key_fields)
+    return {tuple(row[:width]): (row[width], CREATED if row[width + 1] else UPDATED) for row in cursor.fetchall()}
+
+
+def _upsert_sql(model, amendment, rows):
+    results = [None] * len(rows)
+    groups = {}
+    for idx, item in enumerate(rows):
+        groups.setdefault(tuple(sorted(item)), []).append(idx)
+
+    with connection.cursor() as cursor:
+        for fields, indexes in groups.items():
+            for start in range(0, len(indexes), UPSERT_BATCH_SIZE):
+                batch = indexes[start:start + UPSERT_BATCH_SIZE]
+                written = _upsert_batch(cursor, model, amendment, fields, [rows[idx] for idx in batch])
+                for idx in batch:
+                    results[idx] = written.get(_key_of(model, rows[idx]))
+
+    # Rows skipped by the conflict clause are unchanged; their ids take one more query.
+    skipped = [idx for idx, result in enumerate(results) if result is None]
+    if skipped:
+        filters = {f'{name}__in': {rows[idx][name] for idx in skipped} for name in natural_key(model)}
+        key_names = [model._meta.get_field(name).attname for name in natural_key(model)]
+        existing = {
+            tuple(values[:-1]): values[-1]
+            for values in model.objects.filter(imdgamendment=amendment, **filters).values_list(*key_names, 'pk')
+        }
+        for idx in skipped:
+            results[idx] = (existing.get(_key_of(model, rows[idx])), UNCHANGED)
+    return results
+
+
+def _upsert_dangerous_goods(amendment, rows):
+    """
+    Dangerous Goods have no unique natural key in the database, so they are
+    matched on UN number and packing group with one query, then written
+    with bulk_create and bulk_update.
+    """
+    existing = {}
+    queryset = DangerousGoods.objects.filter(imdgamendment=amendment, un_code__in={item['un_code'] for item in rows})
+    for instance in queryset.order_by('pk'):
+        existing.setdefault((instance.un_code, instance.packing_group_code or ''), []).append(instance)
+
+    results = [None] * len(rows)
+    errors = [None] * len(rows)
+    created = []
+    updated = {}
+    for idx, item in enumerate(rows):
+        matches = existing.get(_key_of(DangerousGoods, item), [])
+        if len(matches) > 1:
+            errors[idx] = {'non_field_errors': [f'{len(matches)} Dangerous Goods match this UN number and packing group.']}
+        elif not matches:
+            instance = DangerousGoods(imdgamendment=amendment, **item)
+            created.append((idx, instance))
+        else:
+            instance = matches[0]
+            changed = [name for name, value in item.items() if getattr(instance, name) != value]
+            if changed:
+                for name in changed:
+                    setattr(instance, name, item[name])
+                updated.setdefault(tuple(sorted(changed)), []).append(instance)
+                results[idx] = (instance.pk, UPDATED)
+            else:
+                results[idx] = (instance.pk, UNCHANGED)
+    if any(errors):
+        return None, errors
+
+    DangerousGoods.objects.bulk_create([instance for _, instance in created], batch_size=UPSERT_BATCH_SIZE)
+    for idx, instance in created:
+        results[idx] = (instance.pk, CREATED)
+    for fields, instances in updated.items():
+        DangerousGoods.objects.bulk_update(instances, fields, batch_size=UPSERT_BATCH_SIZE)
+    return results, None
+
+
+def upsert_rows(model, amendment, rows):
+    """
+    Create or update ``rows`` (validated serializer data) of an amendment
+    table, matched on the table's natural key, in one transaction. Returns
+    ``(results, errors)``: one ``{'id', 'status'}`` per row, or per-index
+    errors when nothing was written. Caches are only invalidated when a row
+    was created or updated.
+    """
+    errors = find_upsert_errors(model, rows)
+    if errors:
+        return None, errors
+
+    with transaction.atomic():
+        if model is DangerousGoods:
+            results, errors = _upsert_dangerous_goods(amendment, rows)
+            if errors:
+                return None, errors
+        else:
+            results = _upsert_sql(model, amendment, rows)
+        if any(status != UNCHANGED for _, status in results):
+            amendment_content_changed.send(sender=model, amendment_id=amendment.pk)
+    return [{'id': pk, 'status': status} for pk, status in results], None
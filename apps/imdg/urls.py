@@ -19,6 +19,9 @@ from .views import (
     SegregationRuleViewSet,
     DangerousGoodsViewSet,
     SearchDangerousGoodsViewSet,
+    SegregationCheckViewSet,
+    ExportViewSet,
+    IMDGJobViewSet,
     )
 
 router = DefaultRouter()
@@ -40,6 +43,9 @@ router.register(r'segregations', SegregationViewSet, basename='segregations')
 router.register(r'dangerous-goods', DangerousGoodsViewSet, basename='dangerous_goods')
 router.register(r'segregation-rules', SegregationRuleViewSet, basename='segregation_rules')
 router.register(r'search-dangerous-goods', SearchDangerousGoodsViewSet, basename='search-dangerous-goods')
+router.register(r'segregation-check', SegregationCheckViewSet, basename='segregation_check')
+router.register(r'export', ExportViewSet, basename='export')
+router.register(r'jobs', IMDGJobViewSet, basename='jobs')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,10 +2,34 @@ from django.shortcuts import render
 from django.db.models import Q
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from .permissions import IsStaffUser, IsUser, DjangoModelPermissionsWithView
 from .pagination import CustomPagination
+from .cache import active_amendment_resolver, get_active_amendment, get_content_generation
+from .conditional import conditional_on_generation
+from .response_cache import cached_response, response_cache_stats
+from .lookup_cache import code_lookup_cache
+from .search import search_by_text, typeahead
+from .segregation import check_stowage_plan
+from .exports import EXPORT_FORMATS, build_export_response, stream_async
+from .diff import iter_diff
+from .integrity import check_amendment_references
+from .services import IMDGLookupService
+from .materialize import build_expanded_documents, expanded_documents, get_expanded_documents
+from .tasks import (
+    request_materialization,
+    import_amendment_bundle,
+    clone_amendment_content,
+    delete_all_rows,
+    delete_amendment,
+    create_uploaded_rows,
+    check_references,
+)
+from .jobs import create_job, save_upload
+from .upserts import CREATED, UPDATED, UNCHANGED, UPSERT_LIMIT, upsert_rows
+from .uploads import UPLOAD_READ_SIZE
 from .models import (
     IMDGAmendment,
     UNCode,
@@ -24,6 +48,9 @@ from .models import (
     Segregation,
     SegregationRule,
     DangerousGoods,
+    IMDGJob,
+    DANGEROUS_GOODS_CODE_FIELDS,
+    AMENDMENT_TABLES,
 )
 from .serializers import(
     IMDGAmendmentSerializer,
@@ -43,8 +70,66 @@ from .serializers import(
     SegregationSerializer,
     SegregationRuleSerializer,
     DangerousGoodsSerializer,
+    IMDGJobSerializer,
 )
 
+BATCH_LOOKUP_LIMIT = 5000
+RESOLVE_LIMIT = 100
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+TRUTHY_VALUES = ('1', 'true')
+
+def _include_computed(request):
+    return request.query_params.get('computed', '').lower() in TRUTHY_VALUES
+
+def _upsert_response(request, serializer_class):
+    """Validate a list of rows with ``serializer_class`` and upsert them into the effective IMDG Amendment."""
+    active_amendment = get_active_amendment()
+    if not active_amendment:
+        return Response({"detail": "No active amendment found."}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(request.data, list):
+        return Response({"detail": "Expected a list of rows."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(request.data) > UPSERT_LIMIT:
+        return Response({"detail": f"At most {UPSERT_LIMIT} rows can be upserted at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = serializer_class(data=request.data, many=True, partial=True, context={'request': request, 'upsert': True})
+    serializer.is_valid(raise_exception=True)
+    results, errors = upsert_rows(serializer_class.Meta.model, active_amendment, serializer.validated_data)
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    counts = {outcome: 0 for outcome in (CREATED, UPDATED, UNCHANGED)}
+    for result in results:
+        counts[result['status']] += 1
+    return Response({'results': results, **counts}, status=status.HTTP_200_OK)
+
+def _upload_in_background(request):
+    return request.query_params.get('async', '').lower() in TRUTHY_VALUES
+
+def _queue_upload(request, serializer_class):
+    """
+    Write the JSON array in the request body to disk unparsed and queue its
+    creation in the effective IMDG Amendment with ``serializer_class``; the
+    response is the job, whose errors list the rejected rows.
+    """
+    active_amendment = get_active_amendment()
+    if not active_amendment:
+        return Response({"detail": "No active amendment found."}, status=status.HTTP_400_BAD_REQUEST)
+    if request.content_type.split(';')[0].strip() != 'application/json':
+        return Response({"detail": "Background uploads take a JSON array body."}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    table = next(name for name, model in AMENDMENT_TABLES.items() if model is serializer_class.Meta.model)
+    path = save_upload(iter(lambda: request.read(UPLOAD_READ_SIZE), b''), suffix='.json')
+    job = create_job(IMDGJob.KIND_UPLOAD, active_amendment.pk)
+    create_uploaded_rows.delay(job.pk, table, path)
+    return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+def _queue_delete_all(model):
+    """Queue the deletion of every row of ``model`` in the effective IMDG Amendment and answer with the job."""
+    table = next(name for name, table_model in AMENDMENT_TABLES.items() if table_model is model)
+    job = create_job(IMDGJob.KIND_DELETE_ALL, get_active_amendment().pk)
+    delete_all_rows.delay(job.pk, table)
+    return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
 class IMDGAmendmentViewSet(viewsets.ViewSet):
     permission_classes = [IsStaffUser, DjangoModelPermissionsWithView]
     pagination_class = CustomPagination
@@ -78,10 +163,116 @@ class IMDGAmendmentViewSet(viewsets.ViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
     def destroy(self, request, pk=None):
-        """Delete a IMDGAmendment"""
+        """Delete a IMDGAmendment and all its content in the background; the response is the job."""
         instance = get_object_or_404(self.get_queryset(), pk=pk)
-        instance.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        job = create_job(IMDGJob.KIND_DELETE_AMENDMENT, instance.pk)
+        delete_amendment.delay(job.pk)
+        return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_bundle(self, request):
+        """
+        Import a new IMDG Amendment from an uploaded bundle in the background.
+        Send 'file' (a zip of per-table CSV/NDJSON files, or the NDJSON export
+        of all tables), 'name', and optionally 'activate' and 'allow_dangling'.
+        """
+        upload = request.FILES.get('file')
+        name = request.data.get('name', '')
+        if not upload:
+            return Response({"detail": "Missing 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = IMDGAmendmentSerializer(data={'name': name})
+        serializer.is_valid(raise_exception=True)
+
+        path = save_upload(upload.chunks())
+        job = create_job(IMDGJob.KIND_IMPORT)
+        import_amendment_bundle.delay(
+            job.pk, path, name,
+            activate=str(request.data.get('activate', '')).lower() in TRUTHY_VALUES,
+            allow_dangling=str(request.data.get('allow_dangling', '')).lower() in TRUTHY_VALUES,
+        )
+        return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    @action(detail=True, methods=['post'], url_path='clone')
+    def clone(self, request, pk=None):
+        """
+        Copy every table of an IMDG Amendment into a new draft named 'name' in the background.
+        """
+        instance = get_object_or_404(self.get_queryset(), pk=pk)
+        name = request.data.get('name', '')
+        serializer = IMDGAmendmentSerializer(data={'name': name})
+        serializer.is_valid(raise_exception=True)
+
+        job = create_job(IMDGJob.KIND_CLONE)
+        clone_amendment_content.delay(job.pk, instance.pk, name)
+        return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    @action(detail=True, methods=['get'], url_path='diff')
+    def diff(self, request, pk=None):
+        """
+        Stream the rows added, removed or modified from this IMDG Amendment to the one in 'to', as NDJSON.
+        Restrict it to one table with 'table', which defaults to 'all'.
+        """
+        instance = get_object_or_404(self.get_queryset(), pk=pk)
+        to_param = request.query_params.get('to', '')
+        table = request.query_params.get('table', 'all')
+        if not to_param.isdigit():
+            return Response({"detail": "Missing 'to' parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        if table != 'all' and table not in AMENDMENT_TABLES:
+            return Response({"detail": f"'table' must be 'all' or one of {', '.join(AMENDMENT_TABLES)}."}, status=status.HTTP_400_BAD_REQUEST)
+        target = get_object_or_404(self.get_queryset(), pk=to_param)
+
+        tables = list(AMENDMENT_TABLES) if table == 'all' else [table]
+        response = StreamingHttpResponse(
+            stream_async(iter_diff(instance.pk, target.pk, tables)),
+            content_type=EXPORT_FORMATS['ndjson'],
+        )
+        response['Content-Disposition'] = f'attachment; filename="imdg-diff-{instance.name}-{target.name}.ndjson"'
+        return response
+    @action(detail=True, methods=['get', 'post'], url_path='references')
+    def references(self, request, pk=None):
+        """
+        Codes referenced by the Dangerous Goods of an amendment that its code tables do not define.
+        POST runs the same check as a background job.
+        """
+        instance = get_object_or_404(self.get_queryset(), pk=pk)
+        if request.method == 'POST':
+            job = create_job(IMDGJob.KIND_CHECK_REFERENCES, instance.pk)
+            check_references.delay(job.pk)
+            return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        return Response(check_amendment_references(instance.pk), status=status.HTTP_200_OK)
+    @action(detail=True, methods=['get', 'post'], url_path='materialization')
+    def materialization(self, request, pk=None):
+        """
+        Progress of the expanded Dangerous Goods rebuild of an amendment.
+        POST queues a rebuild, which the effective amendment gets automatically on every write.
+        """
+        instance = get_object_or_404(self.get_queryset(), pk=pk)
+        if request.method == 'POST':
+            if not instance.is_effective:
+                return Response({"detail": "Only the effective IMDG Amendment is materialized."}, status=status.HTTP_400_BAD_REQUEST)
+            job_id = request_materialization(instance.pk, countdown=0)
+            jobs = IMDGJob.objects.filter(imdgamendment=instance, kind=IMDGJob.KIND_MATERIALIZE)
+            # A concurrent request may still be creating the pending job; answer with the latest one.
+            job = (jobs.filter(pk=job_id) if job_id else jobs).first()
+            if job is None:
+                raise Http404('No materialization job found.')
+            return Response(IMDGJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        job = IMDGJob.objects.filter(imdgamendment=instance, kind=IMDGJob.KIND_MATERIALIZE).first()
+        version, _ = get_content_generation(instance.pk)
+        return Response({
+            'job': IMDGJobSerializer(job).data if job else None,
+            'version': version,
+            'materialized': instance.expanded_dangerousgoods.filter(version=version).count(),
+            'dangerous_goods': instance.dangerousgoods.count(),
+        }, status=status.HTTP_200_OK)
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the IMDG caches for this worker.
+        """
+        return Response({
+            'active_amendment': active_amendment_resolver.stats(),
+            'response_cache': response_cache_stats.as_dict(),
+            'code_lookup': code_lookup_cache.stats(),
+        }, status=status.HTTP_200_OK)
 
 
 class UNCodeViewSet(viewsets.ViewSet):
@@ -89,11 +280,13 @@ class UNCodeViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return UNCode.objects.none()
         return UNCode.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """List all UN Codes"""
         un_codes = self.get_queryset()
@@ -101,12 +294,14 @@ class UNCodeViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(un_codes, request)
         serializer = UNCodeSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """Retrieve a UN Code by its primary key"""
         instance = get_object_or_404(self.get_queryset(), pk=pk)
         serializer = UNCodeSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a UN Code by its code, using the effective IMDG Amendment.
@@ -114,17 +309,26 @@ class UNCodeViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code')
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = UNCodeSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(UNCodeSerializer, code_param)
+        if data is None:
+            raise Http404('No UNCode matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """Create a new UN Code"""
+        if _upload_in_background(request):
+            return _queue_upload(request, UNCodeSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = UNCodeSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of UN Codes by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, UNCodeSerializer)
     def partial_update(self, request, pk=None):
         """Partially update a UN Code"""
         instance = get_object_or_404(self.get_queryset(), pk=pk)
@@ -141,25 +345,25 @@ class UNCodeViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all UN Codes associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No UN Codes found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
     
 class ClassDivisionViewSet(viewsets.ViewSet):
     permission_classes = [IsStaffUser, DjangoModelPermissionsWithView]
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return ClassDivision.objects.none()
         return ClassDivision.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Class Divisions
@@ -169,6 +373,7 @@ class ClassDivisionViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(classifications, request)
         serializer = ClassDivisionSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Classification by its primary key
@@ -177,6 +382,7 @@ class ClassDivisionViewSet(viewsets.ViewSet):
         serializer = ClassDivisionSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Class Division by its code, but only from the effective IMDG Amendment.
@@ -184,19 +390,28 @@ class ClassDivisionViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = ClassDivisionSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(ClassDivisionSerializer, code_param)
+        if data is None:
+            raise Http404('No ClassDivision matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Classification
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, ClassDivisionSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = ClassDivisionSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Class Divisions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, ClassDivisionSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Classification
@@ -217,14 +432,12 @@ class ClassDivisionViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Class Divisions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Class Divisions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
     
 """
 Packing Group ViewSet
@@ -234,11 +447,13 @@ class PackingGroupViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return PackingGroup.objects.none()
         return PackingGroup.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Packing Groups
@@ -248,6 +463,7 @@ class PackingGroupViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(packing_groups, request)
         serializer = PackingGroupSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Packing Group by its primary key
@@ -256,6 +472,7 @@ class PackingGroupViewSet(viewsets.ViewSet):
         serializer = PackingGroupSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Packing Group by its code, but only from the effective IMDG Amendment.
@@ -263,19 +480,28 @@ class PackingGroupViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = PackingGroupSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(PackingGroupSerializer, code_param)
+        if data is None:
+            raise Http404('No PackingGroup matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Packing Group
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, PackingGroupSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = PackingGroupSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Packing Groups by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, PackingGroupSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Packing Group
@@ -296,14 +522,12 @@ class PackingGroupViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Packing Groups associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Packing Groups found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Special Provisions ViewSet
@@ -313,11 +537,13 @@ class SpecialProvisionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return SpecialProvisions.objects.none()
         return SpecialProvisions.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Special Provisions
@@ -327,6 +553,7 @@ class SpecialProvisionsViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(special_provisions, request)
         serializer = SpecialProvisionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Special Provision by its primary key
@@ -335,6 +562,7 @@ class SpecialProvisionsViewSet(viewsets.ViewSet):
         serializer = SpecialProvisionsSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Special Provision by its code
@@ -342,19 +570,28 @@ class SpecialProvisionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = SpecialProvisionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(SpecialProvisionsSerializer, code_param)
+        if data is None:
+            raise Http404('No SpecialProvisions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Special Provision
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, SpecialProvisionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = SpecialProvisionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Special Provisions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, SpecialProvisionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Special Provision
@@ -375,14 +612,12 @@ class SpecialProvisionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Special Provisions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Special Provisions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Excepted Quantities ViewSet
@@ -392,11 +627,13 @@ class ExceptedQuantitiesViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return ExceptedQuantities.objects.none()
         return ExceptedQuantities.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Excepted Quantities
@@ -406,6 +643,7 @@ class ExceptedQuantitiesViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(excepted_quantities, request)
         serializer = ExceptedQuantitiesSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve an Excepted Quantity by its primary key
@@ -414,6 +652,7 @@ class ExceptedQuantitiesViewSet(viewsets.ViewSet):
         serializer = ExceptedQuantitiesSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve an Excepted Quantity by its code
@@ -421,19 +660,28 @@ class ExceptedQuantitiesViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = ExceptedQuantitiesSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(ExceptedQuantitiesSerializer, code_param)
+        if data is None:
+            raise Http404('No ExceptedQuantities matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Excepted Quantity
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, ExceptedQuantitiesSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = ExceptedQuantitiesSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Excepted Quantities by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, ExceptedQuantitiesSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update an Excepted Quantity
@@ -454,14 +702,12 @@ class ExceptedQuantitiesViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Excepted Quantities associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Excepted Quantities found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Packing Instructions ViewSet
@@ -471,11 +717,13 @@ class PackingInstructionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return PackingInstructions.objects.none()
         return PackingInstructions.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Packing Instructions
@@ -485,6 +733,7 @@ class PackingInstructionsViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(packing_instructions, request)
         serializer = PackingInstructionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Packing Instruction by its primary key
@@ -493,6 +742,7 @@ class PackingInstructionsViewSet(viewsets.ViewSet):
         serializer = PackingInstructionsSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Packing Instruction by its code
@@ -500,19 +750,28 @@ class PackingInstructionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = PackingInstructionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(PackingInstructionsSerializer, code_param)
+        if data is None:
+            raise Http404('No PackingInstructions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Packing Instruction
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, PackingInstructionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = PackingInstructionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Packing Instructions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, PackingInstructionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Packing Instruction
@@ -533,14 +792,12 @@ class PackingInstructionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Packing Instructions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Packing Instructions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Packing Provisions ViewSet
@@ -550,11 +807,13 @@ class PackingProvisionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return PackingProvisions.objects.none()
         return PackingProvisions.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Packing Provisions
@@ -564,6 +823,7 @@ class PackingProvisionsViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(packing_provisions, request)
         serializer = PackingProvisionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Packing Provision by its primary key
@@ -572,6 +832,7 @@ class PackingProvisionsViewSet(viewsets.ViewSet):
         serializer = PackingProvisionsSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Packing Provision by its code
@@ -579,19 +840,28 @@ class PackingProvisionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = PackingProvisionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(PackingProvisionsSerializer, code_param)
+        if data is None:
+            raise Http404('No PackingProvisions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Packing Provision
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, PackingProvisionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = PackingProvisionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Packing Provisions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, PackingProvisionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Packing Provision
@@ -612,14 +882,12 @@ class PackingProvisionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Packing Provisions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Packing Provisions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 IBC Instructions ViewSet
@@ -629,11 +897,13 @@ class IBCInstructionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return IBCInstructions.objects.none()
         return IBCInstructions.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all IBC Instructions
@@ -643,6 +913,7 @@ class IBCInstructionsViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(ibc_instructions, request)
         serializer = IBCInstructionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve an IBC Instruction by its primary key
@@ -651,6 +922,7 @@ class IBCInstructionsViewSet(viewsets.ViewSet):
         serializer = IBCInstructionsSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve an IBC Instruction by its code
@@ -658,19 +930,28 @@ class IBCInstructionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = IBCInstructionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(IBCInstructionsSerializer, code_param)
+        if data is None:
+            raise Http404('No IBCInstructions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new IBC Instruction
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, IBCInstructionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = IBCInstructionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of IBC Instructions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, IBCInstructionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update an IBC Instruction
@@ -691,14 +972,12 @@ class IBCInstructionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all IBC Instructions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No IBC Instructions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 IBC Provisions ViewSet
@@ -708,11 +987,13 @@ class IBCProvisionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return IBCProvisions.objects.none()
         return IBCProvisions.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all IBC Provisions
@@ -723,6 +1004,7 @@ class IBCProvisionsViewSet(viewsets.ViewSet):
         serializer = IBCProvisionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve an IBC Provision by its code
@@ -730,9 +1012,11 @@ class IBCProvisionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = IBCProvisionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(IBCProvisionsSerializer, code_param)
+        if data is None:
+            raise Http404('No IBCProvisions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve an IBC Provision by its primary key
@@ -745,12 +1029,20 @@ class IBCProvisionsViewSet(viewsets.ViewSet):
         """
         Create a new IBC Provision
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, IBCProvisionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = IBCProvisionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of IBC Provisions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, IBCProvisionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update an IBC Provision
@@ -771,14 +1063,12 @@ class IBCProvisionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all IBC Provisions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No IBC Provisions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Tank Instructions ViewSet
@@ -788,11 +1078,13 @@ class TankInstructionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return TankInstructions.objects.none()
         return TankInstructions.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Tank Instructions
@@ -802,6 +1094,7 @@ class TankInstructionsViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(tank_instructions, request)
         serializer = TankInstructionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Tank Instruction by its primary key
@@ -810,6 +1103,7 @@ class TankInstructionsViewSet(viewsets.ViewSet):
         serializer = TankInstructionsSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Tank Instruction by its code
@@ -817,19 +1111,28 @@ class TankInstructionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = TankInstructionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(TankInstructionsSerializer, code_param)
+        if data is None:
+            raise Http404('No TankInstructions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Tank Instruction
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, TankInstructionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = TankInstructionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Tank Instructions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, TankInstructionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Tank Instruction
@@ -850,14 +1153,12 @@ class TankInstructionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Tank Instructions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Tank Instructions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Tank Provisions ViewSet
@@ -867,11 +1168,13 @@ class TankProvisionsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return TankProvisions.objects.none()
         return TankProvisions.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Tank Provisions
@@ -881,6 +1184,7 @@ class TankProvisionsViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(tank_provisions, request)
         serializer = TankProvisionsSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Tank Provision by its primary key
@@ -889,6 +1193,7 @@ class TankProvisionsViewSet(viewsets.ViewSet):
         serializer = TankProvisionsSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Tank Provision by its code
@@ -896,19 +1201,28 @@ class TankProvisionsViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = TankProvisionsSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(TankProvisionsSerializer, code_param)
+        if data is None:
+            raise Http404('No TankProvisions matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Tank Provision
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, TankProvisionsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = TankProvisionsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Tank Provisions by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, TankProvisionsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Tank Provision
@@ -929,14 +1243,12 @@ class TankProvisionsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Tank Provisions associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Tank Provisions found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Emergency Schedule ViewSet
@@ -946,11 +1258,13 @@ class EmergencySchedulesViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return EmergencySchedules.objects.none()
         return EmergencySchedules.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Emergency Schedules
@@ -960,6 +1274,7 @@ class EmergencySchedulesViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(emergency_schedules, request)
         serializer = EmergencySchedulesSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve an Emergency Schedule by its primary key
@@ -968,6 +1283,7 @@ class EmergencySchedulesViewSet(viewsets.ViewSet):
         serializer = EmergencySchedulesSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve an Emergency Schedule by its code
@@ -975,19 +1291,28 @@ class EmergencySchedulesViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = EmergencySchedulesSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(EmergencySchedulesSerializer, code_param)
+        if data is None:
+            raise Http404('No EmergencySchedules matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Emergency Schedule
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, EmergencySchedulesSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = EmergencySchedulesSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Emregency Schedules by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, EmergencySchedulesSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update an Emergency Schedule
@@ -1008,14 +1333,12 @@ class EmergencySchedulesViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Emregency Schedules associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Emergency Schedules found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Stowage Handling ViewSet
@@ -1025,11 +1348,13 @@ class StowageHandlingViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return StowageHandling.objects.none()
         return StowageHandling.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Stowage Handlings
@@ -1039,6 +1364,7 @@ class StowageHandlingViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(stowage_handlings, request)
         serializer = StowageHandlingSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Stowage Handling by its primary key
@@ -1047,6 +1373,7 @@ class StowageHandlingViewSet(viewsets.ViewSet):
         serializer = StowageHandlingSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Stowage Handling by its code
@@ -1054,19 +1381,28 @@ class StowageHandlingViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = StowageHandlingSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(StowageHandlingSerializer, code_param)
+        if data is None:
+            raise Http404('No StowageHandling matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Stowage Handling
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, StowageHandlingSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = StowageHandlingSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Stowage Handlings by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, StowageHandlingSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Stowage Handling
@@ -1087,14 +1423,12 @@ class StowageHandlingViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Stowage Handlings associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Stowage Handlings found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Segregation ViewSet
@@ -1104,11 +1438,13 @@ class SegregationViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return Segregation.objects.none()
         return Segregation.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Segregations
@@ -1118,6 +1454,7 @@ class SegregationViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(segregations, request)
         serializer = SegregationSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Segregation by its primary key
@@ -1126,6 +1463,7 @@ class SegregationViewSet(viewsets.ViewSet):
         serializer = SegregationSerializer(instance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @action(detail=False, methods=['get'], url_path='get-by-code', permission_classes=[IsUser])
+    @conditional_on_generation
     def get_by_code(self, request):
         """
         Retrieve a Segregation by its code
@@ -1133,19 +1471,28 @@ class SegregationViewSet(viewsets.ViewSet):
         code_param = request.query_params.get('code', None)
         if not code_param:
             return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-        instance = get_object_or_404(self.get_queryset(), code=code_param)
-        serializer = SegregationSerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = code_lookup_cache.get(SegregationSerializer, code_param)
+        if data is None:
+            raise Http404('No Segregation matches the given query.')
+        return Response(data, status=status.HTTP_200_OK)
     def create(self, request):
         """
         Create a new Segregation
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, SegregationSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = SegregationSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Segregations by code in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, SegregationSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Segregation
@@ -1166,14 +1513,12 @@ class SegregationViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Segregations associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Segregations found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Segregation Rule ViewSet
@@ -1182,16 +1527,19 @@ class SegregationRuleViewSet(viewsets.ViewSet):
     permission_classes = [IsStaffUser, DjangoModelPermissionsWithView]
 
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return SegregationRule.objects.none()
         return SegregationRule.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """List all Segregation Bars"""
         segregation_bars = self.get_queryset()
         serializer = SegregationRuleSerializer(segregation_bars, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """Retrieve a Segregation Bar by its primary key"""
         instance = get_object_or_404(self.get_queryset(), pk=pk)
@@ -1199,12 +1547,20 @@ class SegregationRuleViewSet(viewsets.ViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
     def create(self, request):
         """Create a new Segregation Bar or a list of Segregation Bars"""
+        if _upload_in_background(request):
+            return _queue_upload(request, SegregationRuleSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = SegregationRuleSerializer(data=data, many=many, context={'request': request})
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Segregation Rules by class codes in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, SegregationRuleSerializer)
     def partial_update(self, request, pk=None):
         """Partially update a Segregation Bar"""
         instance = get_object_or_404(self.get_queryset(), pk=pk)
@@ -1221,14 +1577,12 @@ class SegregationRuleViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Segregation Rules associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Segregation Rules found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
 
 """
 Dangerous Goods ViewSet
@@ -1238,11 +1592,13 @@ class DangerousGoodsViewSet(viewsets.ViewSet):
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return DangerousGoods.objects.none()
         return DangerousGoods.objects.filter(imdgamendment=active_amendment)
     
+    @conditional_on_generation
+    @cached_response
     def list(self, request):
         """
         List all Dangerous Goods
@@ -1250,8 +1606,10 @@ class DangerousGoodsViewSet(viewsets.ViewSet):
         dangerous_goods = self.get_queryset()
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(dangerous_goods, request)
-        serializer = DangerousGoodsSerializer(page, many=True)
+        context = {'request': request, 'include_computed': _include_computed(request)}
+        serializer = DangerousGoodsSerializer(page, many=True, context=context)
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
         Retrieve a Dangerous Good by its primary key
@@ -1263,12 +1621,20 @@ class DangerousGoodsViewSet(viewsets.ViewSet):
         """
         Create a new Dangerous Good
         """
+        if _upload_in_background(request):
+            return _queue_upload(request, DangerousGoodsSerializer)
         data = request.data
         many = isinstance(data, list)
         serializer = DangerousGoodsSerializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    @action(detail=False, methods=['post'], url_path='upsert')
+    def upsert(self, request):
+        """
+        Create or update a list of Dangerous Goods by UN number and packing group in the effective IMDG Amendment.
+        """
+        return _upsert_response(request, DangerousGoodsSerializer)
     def partial_update(self, request, pk=None):
         """
         Partially update a Dangerous Good
@@ -1289,45 +1655,212 @@ class DangerousGoodsViewSet(viewsets.ViewSet):
     def delete_all(self, request):
         """
         Deletes all Dangerous Goods associated with the current effective IMDG Amendment.
-        This is a bulk delete operation.
+        The rows are deleted in the background; the response is the job.
         """
         queryset = self.get_queryset()
-        count = queryset.count()
-        if count == 0:
+        if not queryset.exists():
             return Response({"detail": "No Dangerous Goods found for the active amendment to delete."}, status=status.HTTP_404_NOT_FOUND)
-        queryset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return _queue_delete_all(queryset.model)
     
 class SearchDangerousGoodsViewSet(viewsets.ViewSet):
     permission_classes = [IsUser]
     pagination_class = CustomPagination
     
     def get_queryset(self):
-        active_amendment = IMDGAmendment.objects.filter(is_effective=True).first()
+        active_amendment = get_active_amendment()
         if not active_amendment:
             return DangerousGoods.objects.none()
         return DangerousGoods.objects.filter(imdgamendment=active_amendment)
 
+    @conditional_on_generation
     def list(self, request):
         """
-        Search Dangerous Goods
+        Search Dangerous Goods by exact UN code, or with ?mode=text by
+        proper shipping name and observations ranked by relevance.
         """
         search_term = request.query_params.get('search', None)
         if not search_term:
             return Response({"detail": "Missing 'search' parameter."}, status=status.HTTP_400_BAD_REQUEST)
 
-        dangerous_goods = self.get_queryset().filter(
-            Q(un_code=search_term)
-        )
+        mode = request.query_params.get('mode', 'un_code')
+        if mode == 'text':
+            dangerous_goods = search_by_text(self.get_queryset(), search_term)
+        elif mode == 'un_code':
+            dangerous_goods = self.get_queryset().filter(
+                Q(un_code=search_term)
+            )
+        else:
+            return Response({"detail": "'mode' must be 'un_code' or 'text'."}, status=status.HTTP_400_BAD_REQUEST)
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(dangerous_goods, request)
-        serializer = DangerousGoodsSerializer(page, many=True)
+        if _include_computed(request):
+            return paginator.get_paginated_response(expanded_documents(get_active_amendment(), page))
+        serializer = DangerousGoodsSerializer(page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
+    @conditional_on_generation
     def retrieve(self, request, pk=None):
         """
-        Retrieve a Dangerous Good by its primary key
+        Retrieve the expanded document of a Dangerous Good by its primary key,
+        read from the materialized table when it is current.
         """
+        if str(pk).isdigit():
+            documents = get_expanded_documents(get_active_amendment(), [int(pk)])
+            if documents:
+                return Response(documents[int(pk)], status=status.HTTP_200_OK)
         instance = get_object_or_404(self.get_queryset(), pk=pk)
-        context = {'request': request, 'view': self}
-        serializer = DangerousGoodsSerializer(instance, context=context)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(build_expanded_documents([instance])[0], status=status.HTTP_200_OK)
+    @action(detail=False, methods=['get'], url_path='typeahead')
+    def typeahead(self, request):
+        """
+        Suggest Dangerous Goods for a UN code or proper shipping name prefix, served from memory.
+        """
+        query = request.query_params.get('q', '')
+        if not query.strip():
+            return Response({"detail": "Missing 'q' parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', TYPEAHEAD_DEFAULT_LIMIT)), TYPEAHEAD_MAX_LIMIT)
+        except ValueError:
+            return Response({"detail": "'limit' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': typeahead(query, max(limit, 1))}, status=status.HTTP_200_OK)
+    @action(detail=False, methods=['get'], url_path='by-reference')
+    @conditional_on_generation
+    def by_reference(self, request):
+        """
+        List the Dangerous Goods referencing a code, e.g. ?type=special_provisions&code=274.
+        """
+        reference_type = request.query_params.get('type')
+        code_param = request.query_params.get('code')
+        if reference_type not in DANGEROUS_GOODS_CODE_FIELDS:
+            return Response({"detail": f"'type' must be one of: {', '.join(DANGEROUS_GOODS_CODE_FIELDS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        if not code_param:
+            return Response({"detail": "Missing 'code' parameter."}, status=status.HTTP_400_BAD_REQUEST)
+
+        field_name, _ = DANGEROUS_GOODS_CODE_FIELDS[reference_type]
+        dangerous_goods = self.get_queryset().filter(**{f'{field_name}__contains': [code_param]})
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(dangerous_goods, request)
+        context = {'request': request, 'include_computed': _include_computed(request)}
+        serializer = DangerousGoodsSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Look up many Dangerous Goods by UN code in a single query.
+        Set 'computed' to include labels, placards and segregation rules.
+        """
+        un_codes = request.data.get('un_codes') if isinstance(request.data, dict) else None
+        if not isinstance(un_codes, list) or not un_codes:
+            return Response({"detail": "'un_codes' must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(un_codes) > BATCH_LOOKUP_LIMIT:
+            return Response({"detail": f"At most {BATCH_LOOKUP_LIMIT} UN codes can be looked up at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+        un_codes = list(dict.fromkeys(str(code).strip() for code in un_codes if code))
+        include_computed = str(request.data.get('computed', '')).lower() in TRUTHY_VALUES
+        lookup_service = IMDGLookupService()
+        found = lookup_service.get_by_un_codes(un_codes)
+
+        instances = [instance for un_code in un_codes for instance in found.get(un_code, [])]
+        context = {'request': request, 'include_computed': include_computed}
+        results = {}
+        for item in DangerousGoodsSerializer(instances, many=True, context=context).data:
+            results.setdefault(item['un_code'], []).append(item)
+
+        return Response({
+            'results': results,
+            'misses': [un_code for un_code in un_codes if un_code not in results],
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='resolve')
+    @conditional_on_generation
+    def resolve(self, request):
+        """
+        Return Dangerous Goods with every referenced code expanded into its
+        description and file, e.g. ?ids=12,13.
+        """
+        ids_param = request.query_params.get('ids', '')
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in ids_param.split(',') if pk.strip()))
+        except ValueError:
+            return Response({"detail": "'ids' must be a comma-separated list of integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({"detail": "Missing 'ids' parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > RESOLVE_LIMIT:
+            return Response({"detail": f"At most {RESOLVE_LIMIT} Dangerous Goods can be resolved at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = list(self.get_queryset().filter(pk__in=ids))
+        found = {instance.pk for instance in instances}
+        return Response({
+            'results': build_expanded_documents(instances),
+            'misses': [pk for pk in ids if pk not in found],
+        }, status=status.HTTP_200_OK)
+
+"""
+Segregation Check ViewSet
+"""
+class SegregationCheckViewSet(viewsets.ViewSet):
+    permission_classes = [IsUser]
+
+    def create(self, request):
+        """
+        Check the segregation requirements between every pair of UN numbers of a stowage plan.
+        """
+        un_codes = request.data.get('un_codes') if isinstance(request.data, dict) else None
+        if not isinstance(un_codes, list) or not un_codes:
+            return Response({"detail": "'un_codes' must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(check_stowage_plan(un_codes), status=status.HTTP_200_OK)
+
+"""
+Export ViewSet
+"""
+class ExportViewSet(viewsets.ViewSet):
+    permission_classes = [IsStaffUser]
+
+    def list(self, request):
+        """
+        Stream a table of the effective IMDG Amendment as NDJSON or CSV, e.g.
+        ?table=dangerous-goods&file_format=csv. With table=all every table is streamed as NDJSON.
+        """
+        table = request.query_params.get('table')
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in EXPORT_FORMATS:
+            return Response({"detail": f"'file_format' must be one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        if table not in AMENDMENT_TABLES and not (table == 'all' and file_format == 'ndjson'):
+            return Response({"detail": f"'table' must be one of: {', '.join(AMENDMENT_TABLES)}, or 'all' for NDJSON."}, status=status.HTTP_400_BAD_REQUEST)
+
+        active_amendment = get_active_amendment()
+        if not active_amendment:
+            return Response({"detail": "No active amendment found."}, status=status.HTTP_404_NOT_FOUND)
+        return build_export_response(request, active_amendment, table, file_format)
+
+"""
+IMDG Job ViewSet
+"""
+class IMDGJobViewSet(viewsets.ViewSet):
+    permission_classes = [IsStaffUser]
+    pagination_class = CustomPagination
+
+    def get_queryset(self):
+        queryset = IMDGJob.objects.order_by('-created_at', '-id')
+        kind = self.request.query_params.get('kind')
+        if kind:
+            queryset = queryset.filter(kind=kind)
+        amendment = self.request.query_params.get('imdgamendment')
+        if amendment and amendment.isdigit():
+            queryset = queryset.filter(imdgamendment_id=amendment)
+        return queryset
+
+    def list(self, request):
+        """
+        List background jobs, newest first, optionally filtered by ?kind= and ?imdgamendment=
+        """
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(self.get_queryset(), request)
+        serializer = IMDGJobSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    def retrieve(self, request, pk=None):
+        """
+        Retrieve the status and progress of a background job
+        """
+        instance = get_object_or_404(IMDGJob.objects.all(), pk=pk)
+        serializer = IMDGJobSerializer(instance)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'corsheaders',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt.token_blacklist',
     'apps.accounts',
@@ -219,6 +220,10 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 os.makedirs(MEDIA_ROOT, exist_ok=True)
 
+# Private uploads handed to IMDG background jobs, on the volume shared with the celery worker
+IMDG_UPLOAD_ROOT = os.path.join(BASE_DIR, 'uploads')
+os.makedirs(IMDG_UPLOAD_ROOT, exist_ok=True)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 